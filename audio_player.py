@@ -1,23 +1,31 @@
 import threading
 import numpy as np
 import sounddevice as sd
-from config import SPEAKER_INDEX
+from audio_utils import earcons
+from metrics import downlink_bytes, player_underruns, player_starved
+from config import SPEAKER_INDEX, LLM_SAMPLE_RATE, PLAYER_CHUNK_LENGTH_S, PLAYER_MIN_BUFFER_S
 
 
 class AudioPlayerAsync:
     def __init__(self):
-        self.CHUNK_LENGTH_S = 0.1  # Increase buffer size to 100ms
-        self.SAMPLE_RATE = 24000
+        self.CHUNK_LENGTH_S = PLAYER_CHUNK_LENGTH_S
+        self.SAMPLE_RATE = LLM_SAMPLE_RATE
         self.CHANNELS = 1
         self.SPEAKER_INDEX = SPEAKER_INDEX
         self.queue = []
         self.lock = threading.Lock()
         self.stream = None
         self.playing = False
-        self.min_buffer_size = int(0.2 * self.SAMPLE_RATE)  # 200ms minimum buffer
+        self.min_buffer_size = int(PLAYER_MIN_BUFFER_S * self.SAMPLE_RATE)
+        self.reference = None  # optional ReferenceBuffer fed with what is played, for echo cancellation
+        self.envelope = None  # optional PlaybackEnvelope fed with what is played, for the visualizer
+        self.samples_played = 0  # queued samples handed to the device so far
+        self.cue = None  # earcon mixed over the output, see audio_utils.EarconPlayer
+        self.cue_position = 0
     
     def callback(self, outdata, frames, time, status):  # noqa
-        global signal
+        if status and status.output_underflow:
+            player_underruns.inc()
         with self.lock:
             data = np.empty(0, dtype=np.int16)
 
@@ -28,45 +36,90 @@ class AudioPlayerAsync:
                 data = np.concatenate((data, item[:frames_needed]))
                 if len(item) > frames_needed:
                     self.queue.insert(0, item[frames_needed:])
+            self.samples_played += len(data)
+            if 0 < len(data) < frames:
+                player_starved.inc()
             
             # fill the rest of the frames with zeros if there is no more data
             if len(data) < frames:
                 data = np.concatenate((data, np.zeros(frames - len(data), dtype=np.int16)))
+            
+            if self.cue is not None:
+                chunk = self.cue[self.cue_position:self.cue_position + frames]
+                self.cue_position += len(chunk)
+                mixed = data[:len(chunk)].astype(np.int32) + chunk
+                data[:len(chunk)] = np.clip(mixed, -32768, 32767)
+                if self.cue_position >= len(self.cue):
+                    self.cue = None
 
         outdata[:] = data.reshape(-1, 1)
-        signal = np.frombuffer(outdata, dtype=np.int16)
+        if self.reference is not None:
+            self.reference.write(data)
+        if self.envelope is not None:
+            self.envelope.write(data)
    
+    def add_cue(self, samples):
+        """Mix an int16 earcon over the output, cutting off the one playing"""
+        with self.lock:
+            self.cue = samples
+            self.cue_position = 0
+    
     def add_data(self, data: bytes):
+        downlink_bytes.inc(len(data))
         with self.lock:
             # bytes is pcm16 single channel audio data, convert to numpy array
             np_data = np.frombuffer(data, dtype=np.int16)
             self.queue.append(np_data)
             
             # Only start playing when we have enough buffer to prevent underruns
+            start = False
             if not self.playing:
                 total_samples = sum(len(chunk) for chunk in self.queue)
-                if total_samples >= self.min_buffer_size:
-                    self.start()
+                start = self.playing = total_samples >= self.min_buffer_size
+        if start:
+            self.start()  # outside the lock, it takes the earcon player's
 
     def start(self):
         self.playing = True
-        self.stream = sd.OutputStream(
-            device = self.SPEAKER_INDEX,
-            callback=self.callback,
-            samplerate=self.SAMPLE_RATE,
-            channels=self.CHANNELS,
-            dtype=np.int16,
-            blocksize=int(self.CHUNK_LENGTH_S * self.SAMPLE_RATE),
-            latency='low',  # Request low latency but stable buffering
-        )
+        # One stream on the speaker: take over an earcon that is playing on its own
+        rest = earcons.hand_over(self)
+        if rest is not None and len(rest):
+            self.add_cue(rest)
+        try:
+            self.stream = sd.OutputStream(
+                device = self.SPEAKER_INDEX,
+                callback=self.callback,
+                samplerate=self.SAMPLE_RATE,
+                channels=self.CHANNELS,
+                dtype=np.int16,
+                blocksize=int(self.CHUNK_LENGTH_S * self.SAMPLE_RATE),
+                latency='low',  # Request low latency but stable buffering
+            )
+        except Exception:
+            self.terminate()  # gives the speaker and the earcon back
+            raise
+        if self.reference is not None:
+            self.reference.restart(self.stream.latency)
+        if self.envelope is not None:
+            self.envelope.restart(self.stream.latency)
         self.stream.start()
 
     def stop(self):
         self.playing = False
-        self.stream.stop()
+        if self.stream:
+            self.stream.stop()
         self.terminate()
         with self.lock:
             self.queue = []
 
     def terminate(self):
-        self.stream.close()
\ No newline at end of file
+        """Close the output stream, safe to call when none was started"""
+        stream, self.stream = self.stream, None
+        if stream:
+            stream.close()
+        earcons.release(self)
+        with self.lock:
+            rest = self.cue[self.cue_position:] if self.cue is not None else None
+            self.cue = None
+        if rest is not None and len(rest):
+            earcons.play_samples(rest)  # the earcon player finishes it on its own stream
\ No newline at end of file
@@ -1,7 +1,8 @@
 import math
+import queue
+import threading
 import numpy as np
-import pyaudio
-from config import SPEAKER_INDEX
+from config import SPEAKER_INDEX, LLM_SAMPLE_RATE
 
 
 def make_sinewave(frequency, length, sample_rate=48000):
@@ -12,23 +13,180 @@ def make_sinewave(frequency, length, sample_rate=48000):
     return waveform
 
 
-# Pre-generate acknowledgment beep waves
-wave1 = make_sinewave(500, 0.08)
-wave2 = make_sinewave(400, 0.08)
-
-
-def ack_beep():
-    """Play acknowledgment beep when wake word is detected."""
-    beep = pyaudio.PyAudio()
-    stream = beep.open(
-        output_device_index=SPEAKER_INDEX, 
-        format=pyaudio.paFloat32, 
-        channels=1, 
-        rate=48000, 
-        output=1,
-    )
-    stream.write(wave2.astype(np.float32).tobytes())
-    stream.write(wave1.astype(np.float32).tobytes())
-    stream.stop_stream()
-    stream.close()
-    beep.terminate()
\ No newline at end of file
+def make_cue(tones, sample_rate, fade=0.005):
+    """Concatenate (frequency, seconds) tones into one float32 cue with short fades against clicks"""
+    parts = []
+    for frequency, length in tones:
+        wave = make_sinewave(frequency, length, sample_rate)
+        ramp = np.linspace(0, 1, min(int(fade * sample_rate), len(wave) // 2))
+        wave[:len(ramp)] *= ramp
+        wave[len(wave) - len(ramp):] *= ramp[::-1]
+        parts.append(wave)
+    return np.concatenate(parts).astype(np.float32)
+
+
+# Earcon name -> (frequency, seconds) tones, rendered at the player's rate
+EARCONS = {
+    "wake": [(400, 0.08), (500, 0.08)],
+    "timeout": [(500, 0.08), (400, 0.08)],
+    "interrupted": [(600, 0.05)],
+    "error": [(500, 0.1), (400, 0.1), (300, 0.2)],
+    "timer": [(600, 0.1), (800, 0.1), (600, 0.1), (800, 0.1)],
+}
+
+
+class EarconPlayer:
+    """Plays short preloaded cues without holding on to the speaker.
+
+    play() returns immediately, from any thread. While the conversation's
+    AudioPlayerAsync has its stream open the cue is mixed into it, so there
+    is one output stream and the echo canceller's reference includes the
+    cue. Otherwise a worker thread opens a stream just for the cue and
+    closes it afterwards. Whichever side opens or closes the speaker
+    mid-cue hands the rest of the cue to the other. A new cue cuts off the
+    one currently playing.
+    """
+    def __init__(self, device_index=SPEAKER_INDEX, sample_rate=LLM_SAMPLE_RATE, blocksize=1024):
+        self.device_index = device_index
+        self.sample_rate = sample_rate
+        self.blocksize = blocksize
+        self.cues = {name: (make_cue(tones, sample_rate) * 32767).astype(np.int16)
+                     for name, tones in EARCONS.items()}
+        self.requests = queue.Queue()
+        # Taken before a player's lock, never while holding one
+        self.lock = threading.Lock()
+        self.player = None  # AudioPlayerAsync of the running conversation
+        self.owner = None  # AudioPlayerAsync that has the speaker open, cues are mixed into it
+        self.reference = None  # its echo canceller reference while the cue stream is open
+        self.stream = None
+        self.next = None  # cue for the callback to switch to
+        self.current = None
+        self.position = 0
+        self.finished = threading.Event()
+        self.thread = None
+
+    def start(self):
+        """Start the worker thread, play() does it too"""
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="earcons", daemon=True)
+                self.thread.start()
+
+    def attach(self, player):
+        """Feed cues played on their own stream into the conversation's echo canceller reference"""
+        with self.lock:
+            self.player = player
+
+    def detach(self, player):
+        with self.lock:
+            if self.player is player:
+                self.player = None
+
+    def play(self, name):
+        """Queue a cue by name and return immediately"""
+        self.play_samples(self.cues[name])
+
+    def play_samples(self, samples):
+        self.start()
+        self.requests.put(samples)
+
+    def hand_over(self, player):
+        """`player` is opening the speaker: close the cue stream and return the rest of the cue, if any"""
+        with self.lock:
+            self.owner = player
+            if self.stream is None:
+                return None
+            stream, self.stream = self.stream, None
+            stream.abort()
+            stream.close()
+            if self.next is not None:
+                rest = self.next
+            elif self.current is not None:
+                rest = self.current[self.position:]
+            else:
+                rest = None
+            self.next = self.current = None
+            self.finished.set()
+            return rest
+
+    def release(self, player):
+        """`player` closed the speaker, cues get their own stream again"""
+        with self.lock:
+            if self.owner is player:
+                self.owner = None
+
+    def _run(self):
+        while True:
+            cue = self.requests.get()
+            if cue is None:
+                break
+            self._play(cue)
+            # Keep the stream for a cue queued right behind this one, close it otherwise
+            while self.requests.empty() and not self.finished.wait(0.02):
+                pass
+            if self.requests.empty():
+                self._close()
+
+    def _play(self, cue):
+        with self.lock:
+            if self.owner is not None:
+                self.owner.add_cue(cue)
+                self.finished.set()
+                return
+            self.finished.clear()
+            self.next = cue
+            if self.stream is None:
+                self._open()
+
+    def _open(self):
+        import sounddevice as sd  # part of the session stack, main_ui imports it after startup
+        self.reference = self.player.reference if self.player else None
+        try:
+            self.stream = sd.OutputStream(
+                device=self.device_index,
+                callback=self._callback,
+                samplerate=self.sample_rate,
+                channels=1,
+                dtype=np.int16,
+                blocksize=self.blocksize,
+            )
+        except Exception as e:
+            print(f"Error opening earcon stream: {e}")
+            self.finished.set()
+            return
+        if self.reference is not None:
+            self.reference.restart(self.stream.latency)
+        self.stream.start()
+
+    def _close(self):
+        with self.lock:
+            stream, self.stream = self.stream, None
+            if stream:
+                stream.stop()  # plays out what is still buffered
+                stream.close()
+
+    def _callback(self, outdata, frames, time, status):  # noqa
+        if self.next is not None:
+            self.current, self.next, self.position = self.next, None, 0
+        out = np.zeros(frames, dtype=np.int16)
+        if self.current is not None:
+            chunk = self.current[self.position:self.position + frames]
+            out[:len(chunk)] = chunk
+            self.position += len(chunk)
+            if self.position >= len(self.current):
+                self.current = None
+                self.finished.set()
+        outdata[:] = out.reshape(-1, 1)
+        if self.reference is not None:
+            self.reference.write(out)
+
+    def stop(self):
+        if self.thread:
+            self.requests.put(None)
+            self.thread.join(timeout=2)
+            self.thread = None
+        self._close()
+
+
+# Shared by the wake path, both realtime clients and the tools
+earcons = EarconPlayer()
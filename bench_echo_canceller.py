@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Measure echo canceller cost and echo reduction on synthetic audio.
+
+Usage:
+    python3 bench_echo_canceller.py [SECONDS]
+
+Plays a speech-like far-end signal through a simulated room, cancels it
+and reports CPU time per second of audio (so we know which hardware can
+run FULL_DUPLEX) along with echo return loss enhancement (ERLE).
+"""
+
+import sys
+import time
+import numpy as np
+
+from config import LLM_SAMPLE_RATE, AEC_BLOCK_SIZE, AEC_FILTER_MS
+from echo_canceller import EchoCanceller, ReferenceBuffer
+
+
+def speech_like(seconds, rate, rng):
+    """Noise shaped with a syllable-rate envelope, roughly like speech."""
+    t = np.arange(int(seconds * rate)) / rate
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t) ** 2
+    noise = np.convolve(rng.standard_normal(len(t)), np.ones(8) / 8, mode="same")
+    return 0.3 * envelope * noise / np.max(np.abs(noise))
+
+
+def room_response(rate, rng, delay_ms=20, tail_ms=60):
+    """Random exponentially decaying echo path with a bulk delay."""
+    delay = int(delay_ms / 1000 * rate)
+    tail = int(tail_ms / 1000 * rate)
+    decay = np.exp(-np.arange(tail) / (tail / 5))
+    return np.concatenate((np.zeros(delay), 0.5 * rng.standard_normal(tail) * decay / np.sqrt(tail / 5)))
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+    rate = LLM_SAMPLE_RATE
+    rng = np.random.default_rng(0)
+
+    far = speech_like(seconds, rate, rng)
+    echo = np.convolve(far, room_response(rate, rng))[:len(far)]
+    mic = echo + 0.001 * rng.standard_normal(len(far))
+
+    reference = ReferenceBuffer(rate, max_seconds=seconds + 1)
+    reference.restart()
+    reference.write((far * 32767).astype(np.int16))
+    canceller = EchoCanceller(reference)
+
+    chunk = 512  # roughly what the capture path delivers after resampling
+    mic_int16 = (mic * 32767).astype(np.int16)
+    outputs = []
+    start = time.process_time()
+    for i in range(0, len(mic_int16), chunk):
+        outputs.append(canceller.process(mic_int16[i:i + chunk]))
+    cpu = time.process_time() - start
+
+    out = np.concatenate(outputs).astype(np.float64) / 32768.0
+    settled = slice(len(out) // 2, len(out))  # skip convergence
+    erle = 10 * np.log10(np.sum(mic[settled] ** 2) / (np.sum(out[settled] ** 2) + 1e-12))
+
+    print(f"Echo canceller: {AEC_BLOCK_SIZE} sample blocks, {AEC_FILTER_MS}ms filter, {rate}Hz")
+    print(f"Processed {seconds:.1f}s of audio in {cpu:.3f}s CPU")
+    print(f"CPU per audio second: {cpu / seconds * 1000:.1f}ms ({cpu / seconds:.1%} of one core)")
+    print(f"ERLE after convergence: {erle:.1f}dB")
+
+
+if __name__ == "__main__":
+    main()
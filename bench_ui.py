@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""Headless render benchmark for GameUI.
+
+Usage:
+    python3 bench_ui.py [--seconds N] [--scale S] [--json FILE] [WIDTHxHEIGHT ...]
+    python3 bench_ui.py --compare [WIDTHxHEIGHT ...]
+    python3 bench_ui.py --states [WIDTHxHEIGHT ...]
+
+Runs under the SDL dummy video driver, so it works over SSH on any Pi.
+By default it cycles through every UIState with synthetic audio, captions
+while speaking and particle bursts, and reports per-stage frame-time
+percentiles plus the whole render() in dirty mode, the frame that ships,
+optionally as JSON for regression tracking. --compare times the stages against the
+previous implementations kept below for reference. --states runs the real
+render loop in every UIState and reports CPU use and frame rate for the
+full and dirty-rectangle render modes.
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from datetime import datetime
+
+import numpy as np
+import pygame
+
+from game_ui import GameUI, Colors, UIState
+from perf_stats import LatencyStats
+from config import RECORDING_SAMPLE_RATE
+
+STAGES = ["draw_background", "draw_central_orb", "draw_waveform", "draw_transcript", "draw_particles",
+          "draw_status_text"]
+CAPTION_WORDS = ("sure, here is what the weather looks like for the rest of the week: mostly sunny, "
+                 "a few clouds on Thursday and rain moving in over the weekend").split()
+
+
+def legacy_draw_background(ui):
+    """draw_background before the grid was cached: fill plus one line call per grid line"""
+    ui.screen.fill(ui.bg_color)
+    grid_spacing = 50
+    offset = (ui.time * 20) % grid_spacing
+    for x in range(-grid_spacing, ui.width + grid_spacing, grid_spacing):
+        pygame.draw.line(ui.screen, Colors.DARK_BLUE, (x + offset, 0), (x + offset, ui.height), 1)
+    for y in range(-grid_spacing, ui.height + grid_spacing, grid_spacing):
+        pygame.draw.line(ui.screen, Colors.DARK_BLUE, (0, y + offset), (ui.width, y + offset), 1)
+
+
+def legacy_draw_central_orb(ui):
+    """draw_central_orb before glow sprites: seven opaque circle calls per frame"""
+    pulse_radius = 80 + (ui.pulse_intensity * 30)
+    for i in range(5):
+        pygame.draw.circle(ui.screen, ui.orb_color, (ui.center_x, ui.center_y), int(pulse_radius + i * 10), 2)
+    pygame.draw.circle(ui.screen, ui.orb_color, (ui.center_x, ui.center_y), int(pulse_radius), 3)
+    core_radius = int(pulse_radius * 0.3 + math.sin(ui.time * 3) * 5)
+    pygame.draw.circle(ui.screen, Colors.WHITE, (ui.center_x, ui.center_y), core_radius)
+
+
+def pulsing(draw):
+    """Wrap a stage so the orb pulses through its whole radius range"""
+    def stage(ui):
+        ui.pulse_intensity = 0.5 + 0.5 * math.sin(ui.time * 7)
+        draw(ui)
+    return stage
+
+
+def legacy_draw_status_text(ui):
+    """draw_status_text before the text cache: two font.render calls per frame"""
+    rendered = ui.font_medium.render("Listening for 'Jarvis'...", True, ui.orb_color)
+    ui.screen.blit(rendered, rendered.get_rect(center=(ui.center_x, ui.center_y + 250)))
+    time_text = ui.font_small.render(datetime.now().strftime("%H:%M:%S"), True, Colors.GRAY)
+    ui.screen.blit(time_text, (20, 20))
+
+
+class LegacyParticle:
+    """Particle before the struct-of-arrays system: one Python object per particle"""
+    def __init__(self, x, y, vx, vy, color, lifetime):
+        self.x, self.y, self.vx, self.vy = x, y, vx, vy
+        self.color = color
+        self.lifetime = self.max_lifetime = lifetime
+        self.size = 2
+
+    def update(self, dt):
+        self.x += self.vx * dt
+        self.y += self.vy * dt
+        self.lifetime -= dt
+        self.size = max(1, int(self.size * (self.lifetime / self.max_lifetime)))
+
+    def draw(self, screen):
+        if self.lifetime > 0:
+            pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.size)
+
+
+def legacy_emit(ui, particles, count):
+    for _ in range(count):
+        angle = np.random.uniform(0, 2 * np.pi)
+        speed = np.random.uniform(50, 200)
+        particles.append(LegacyParticle(ui.center_x, ui.center_y, math.cos(angle) * speed,
+                                        math.sin(angle) * speed, Colors.GREEN, np.random.uniform(1.0, 2.0)))
+
+
+def particle_stages(count):
+    """Emit `count` particles then keep them topped up, so each frame draws about `count`"""
+    legacy = []
+
+    def before(ui):
+        nonlocal legacy
+        legacy_emit(ui, legacy, count - len(legacy))
+        legacy = [p for p in legacy if p.lifetime > 0]
+        for particle in legacy:
+            particle.update(1 / 60)
+            particle.draw(ui.screen)
+
+    def after(ui):
+        ui.particles.emit(ui.center_x, ui.center_y, count - len(ui.particles), Colors.GREEN)
+        ui.draw_particles(1 / 60)
+
+    return (f"draw_particles x{count}", before, after)
+
+
+def time_stage(ui, draw, frames=300, warmup=150):
+    """Average milliseconds per call of `draw`, advancing the animation clock each frame."""
+    for _ in range(warmup):  # fill sprite caches, ~2.5s of animation covers every pulse radius
+        ui.time += 1 / 60
+        draw()
+    start = time.perf_counter()
+    for _ in range(frames):
+        ui.time += 1 / 60
+        draw()
+    return (time.perf_counter() - start) / frames * 1000
+
+
+def state_cpu(ui, seconds=2.0):
+    """Run the render loop in each state at its target frame rate, report CPU and fps"""
+    for state in UIState:
+        ui.set_state(state)
+        ui.consume_updates()
+        # Measure the steady state, not the burst and ramp right after the change
+        ui.particles.clear()
+        ui.last_activity = 0
+        ui.dirty_rects = []
+
+        frames = 0
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        while time.perf_counter() - wall_start < seconds:
+            ui.consume_updates()
+            dt = ui.clock.tick(ui.target_fps()) / 1000.0
+            ui.update(dt)
+            ui.render(dt)
+            frames += 1
+        cpu = time.process_time() - cpu_start
+        wall = time.perf_counter() - wall_start
+        print(f"    {state.value:14s} {cpu / wall:6.1%} CPU  {frames / wall:5.1f} fps")
+
+
+def synthetic_speech(chunk, rate, t):
+    """One chunk of speech-like int16 audio: harmonics under a syllable-rate envelope"""
+    times = t + np.arange(chunk) / rate
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * times) ** 2
+    tone = sum(np.sin(2 * np.pi * 180 * k * times) / k for k in range(1, 6))
+    return (6000 * envelope * tone).astype(np.int16)
+
+
+def drive(ui, state, frame, dt, burst_every, burst_size, chunk=1024, word_s=0.15):
+    """Feed the UI what a live session would during one frame of `state`"""
+    if state in (UIState.PROCESSING, UIState.SPEAKING):
+        ui.update_audio_data(synthetic_speech(chunk, RECORDING_SAMPLE_RATE, ui.time))
+    if state == UIState.SPEAKING:
+        word = int(frame * dt / word_s)
+        if frame == 0 or word != int((frame - 1) * dt / word_s):
+            ui.add_transcript(CAPTION_WORDS[word % len(CAPTION_WORDS)] + " ")
+            if word % len(CAPTION_WORDS) == len(CAPTION_WORDS) - 1:
+                ui.end_transcript_turn()
+    if frame % max(1, round(burst_every / dt)) == 0:
+        ui.particles.emit(ui.center_x, ui.center_y, burst_size, ui.orb_color)
+
+
+def stage_benchmark(ui, seconds, burst_every=0.5, burst_size=200):
+    """Cycle through every state, timing each draw stage of every frame, then whole dirty-mode frames"""
+    results = {}
+    dt = 1 / 60
+    frames = int(seconds / dt)
+    for state in UIState:
+        ui.set_state(state)
+        stats = {name: LatencyStats(name) for name in STAGES + ["present", "frame", "render"]}
+
+        for frame in range(frames):
+            drive(ui, state, frame, dt, burst_every, burst_size)
+            frame_start = time.perf_counter()
+            ui.update(dt)
+            ui.consume_updates()
+            ui.grid_time += dt
+            for name in STAGES:
+                start = time.perf_counter()
+                if name == "draw_particles":
+                    ui.draw_particles(dt)
+                else:
+                    getattr(ui, name)()
+                stats[name].add(time.perf_counter() - start)
+            start = time.perf_counter()
+            ui.present()
+            stats["present"].add(time.perf_counter() - start)
+            stats["frame"].add(time.perf_counter() - frame_start)
+
+        # The frame as main_ui draws it, which only redraws the changed regions while idle
+        mode, ui.render_mode, ui.dirty_rects = ui.render_mode, "dirty", []
+        for frame in range(frames):
+            drive(ui, state, frame, dt, burst_every, burst_size)
+            ui.update(dt)
+            start = time.perf_counter()
+            ui.render(dt)
+            stats["render"].add(time.perf_counter() - start)
+        ui.render_mode, ui.dirty_rects = mode, []
+
+        results[state.value] = {name: stat.summary() for name, stat in stats.items()}
+    return results
+
+
+def print_stage_results(resolution, results):
+    print(resolution)
+    for state, stages in results.items():
+        frame = stages["frame"]
+        render = stages["render"]
+        print(f"  {state}: frame p50={frame['p50']:.2f}ms p95={frame['p95']:.2f}ms p99={frame['p99']:.2f}ms, "
+              f"dirty render() p50={render['p50']:.2f}ms p95={render['p95']:.2f}ms p99={render['p99']:.2f}ms")
+        for name in STAGES + ["present"]:
+            s = stages[name]
+            print(f"    {name:18s} p50={s['p50']:.3f}ms p95={s['p95']:.3f}ms p99={s['p99']:.3f}ms max={s['max']:.3f}ms")
+
+
+def compare(ui):
+    """Time each stage against its previous implementation"""
+    stages = [
+        ("draw_background", legacy_draw_background, lambda ui: ui.draw_background()),
+        ("draw_central_orb", pulsing(legacy_draw_central_orb), pulsing(lambda ui: ui.draw_central_orb())),
+        ("draw_status_text", legacy_draw_status_text, lambda ui: ui.draw_status_text()),
+        particle_stages(50),
+        particle_stages(2000),
+    ]
+    for name, before, after in stages:
+        ui.draw_background()
+        before_ms = time_stage(ui, lambda: before(ui))
+        after_ms = time_stage(ui, lambda: after(ui))
+        print(f"  {name}: {before_ms:.3f}ms before, {after_ms:.3f}ms after ({before_ms / after_ms:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless GameUI render benchmark")
+    parser.add_argument("resolutions", nargs="*", default=["1280x720", "1920x1080", "3840x2160"],
+                        help="display sizes as WIDTHxHEIGHT")
+    parser.add_argument("--seconds", type=float, default=3.0, help="simulated seconds per state")
+    parser.add_argument("--scale", default="1.0", help="internal render scale, or auto")
+    parser.add_argument("--json", metavar="FILE", help="write per-stage percentiles as JSON")
+    parser.add_argument("--compare", action="store_true", help="compare stages with previous implementations")
+    parser.add_argument("--states", action="store_true", help="CPU and fps per state, full vs dirty rendering")
+    args = parser.parse_args()
+
+    report = {
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "sdl": ".".join(str(v) for v in pygame.get_sdl_version()),
+        "video_driver": os.environ["SDL_VIDEODRIVER"],
+        "seconds_per_state": args.seconds,
+        "render_scale": args.scale,
+        "resolutions": {},
+    }
+
+    for resolution in args.resolutions:
+        width, height = (int(v) for v in resolution.split("x"))
+        if args.states:
+            print(f"{width}x{height}")
+            for mode in ("full", "dirty"):
+                ui = GameUI(width, height, fullscreen=False, render_mode=mode, render_scale=args.scale)
+                print(f"  {mode} render mode")
+                state_cpu(ui)
+                ui.visualizer.stop()
+                pygame.quit()
+            continue
+
+        ui = GameUI(width, height, fullscreen=False, render_mode="full",
+                    render_scale=1.0 if args.compare else args.scale)
+        if args.compare:
+            print(f"{width}x{height}")
+            compare(ui)
+        else:
+            results = stage_benchmark(ui, args.seconds)
+            report["resolutions"][resolution] = results
+            print_stage_results(resolution, results)
+        ui.visualizer.stop()
+        pygame.quit()
+
+    if args.json and report["resolutions"]:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
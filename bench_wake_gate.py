@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Compare Porcupine with and without the energy pre-filter.
+
+Usage:
+    python3 bench_wake_gate.py CORPUS_DIR [IDLE_DIR]
+
+CORPUS_DIR holds 16kHz mono 16-bit WAV files containing the wake word,
+IDLE_DIR (optional) holds recordings of the room with nobody talking.
+For each set the script reports detections and CPU time spent in the
+wake engine, so recall and idle savings can be checked before deploying.
+"""
+
+import os
+import struct
+import sys
+import time
+import wave
+
+import pvporcupine
+
+from config import PICOVOICE_KEY
+from wake_word import EnergyGate
+
+
+def load_frames(path, frame_length, sample_rate):
+    """Split a WAV file into raw int16 frames of Porcupine's frame length."""
+    with wave.open(path, "rb") as wav:
+        if wav.getframerate() != sample_rate or wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: expected {sample_rate}Hz mono 16-bit audio")
+        pcm = wav.readframes(wav.getnframes())
+    step = frame_length * 2
+    return [pcm[i:i + step] for i in range(0, len(pcm) - step + 1, step)]
+
+
+def run(frames, gated):
+    """Run one file through a fresh engine, return (detections, cpu seconds)."""
+    porcupine = pvporcupine.create(keywords=["jarvis"], access_key=PICOVOICE_KEY)
+    gate = EnergyGate() if gated else None
+    frame_format = "h" * porcupine.frame_length
+    refractory = int(porcupine.sample_rate / porcupine.frame_length)  # ~1s, as in wakeup_detect
+    detections = 0
+    cooldown = 0
+
+    start = time.process_time()
+    try:
+        for pcm in frames:
+            if cooldown > 0:
+                cooldown -= 1
+                continue
+            for frame in (gate.process(pcm) if gate else [pcm]):
+                if porcupine.process(struct.unpack_from(frame_format, frame)) >= 0:
+                    detections += 1
+                    cooldown = refractory
+                    if gate:
+                        gate.reset()
+                    break
+    finally:
+        cpu = time.process_time() - start
+        porcupine.delete()
+    return detections, cpu
+
+
+def bench_dir(directory):
+    probe = pvporcupine.create(keywords=["jarvis"], access_key=PICOVOICE_KEY)
+    frame_length, sample_rate = probe.frame_length, probe.sample_rate
+    probe.delete()
+
+    totals = {False: [0, 0.0], True: [0, 0.0]}
+    audio_seconds = 0.0
+    for name in sorted(os.listdir(directory)):
+        if not name.lower().endswith(".wav"):
+            continue
+        frames = load_frames(os.path.join(directory, name), frame_length, sample_rate)
+        audio_seconds += len(frames) * frame_length / sample_rate
+        results = {gated: run(frames, gated) for gated in (False, True)}
+        marker = "" if results[False][0] == results[True][0] else "  <-- MISMATCH"
+        print(f"  {name}: {results[False][0]} ungated / {results[True][0]} gated{marker}")
+        for gated, (detections, cpu) in results.items():
+            totals[gated][0] += detections
+            totals[gated][1] += cpu
+    return totals, audio_seconds
+
+
+def report(label, totals, audio_seconds):
+    (base_det, base_cpu), (gate_det, gate_cpu) = totals[False], totals[True]
+    print(f"{label}: {audio_seconds:.1f}s of audio")
+    print(f"  Detections: {base_det} ungated, {gate_det} gated")
+    if audio_seconds > 0:
+        print(f"  CPU per audio second: {base_cpu / audio_seconds * 1000:.2f}ms ungated, "
+              f"{gate_cpu / audio_seconds * 1000:.2f}ms gated")
+    if base_cpu > 0:
+        print(f"  CPU reduction: {(1 - gate_cpu / base_cpu):.1%}")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    print("Wake word corpus:")
+    totals, seconds = bench_dir(sys.argv[1])
+    report("Wake word corpus", totals, seconds)
+    recall_ok = totals[False][0] == totals[True][0]
+
+    if len(sys.argv) > 2:
+        print()
+        print("Idle corpus:")
+        report("Idle corpus", *bench_dir(sys.argv[2]))
+
+    print()
+    print("✓ Recall unchanged" if recall_ok else "✗ Gate changed recall, tune WAKE_GATE_* in config.py")
+    sys.exit(0 if recall_ok else 1)
+
+
+if __name__ == "__main__":
+    main()
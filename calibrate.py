@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""Measure this device and write a tuned config profile.
+
+Usage:
+    python3 calibrate.py [--output FILE] [--resolution WIDTHxHEIGHT] [--skip-audio] [--skip-ui] [--dry-run]
+
+Builds on test_audio.py. Measures speaker-to-mic round-trip latency,
+callback stability of the playback stream at several block sizes, mic
+read timing at several chunk sizes, resampler cost and GameUI frame time,
+then writes the settings that
+fit this hardware to device_profile.json, which config.py loads on startup.
+Keep the room quiet and the volume up while the round-trip chirps play.
+"""
+
+import argparse
+import json
+import os
+import platform
+import time
+from datetime import datetime
+
+import numpy as np
+import sounddevice as sd
+
+# Measure against the defaults in config.py, not the profile an earlier run wrote. Set before
+# anything imports config, every module picks its settings up at import time
+DEVICE_PROFILE = os.getenv('SKYAI_PROFILE') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'device_profile.json')
+os.environ['SKYAI_PROFILE'] = ""
+
+from config import (
+    MIC_INDEX,
+    SPEAKER_INDEX,
+    RECORDING_SAMPLE_RATE,
+    LLM_SAMPLE_RATE,
+)
+from perf_stats import LatencyStats
+from test_audio import test_audio_devices
+
+PLAYER_BLOCKS_S = (0.02, 0.05, 0.1, 0.2)
+CAPTURE_BLOCKS = (256, 512, 1024, 2048)
+RENDER_SCALES = (1.0, 0.75, 0.5)
+FRAME_RATES = (60, 50, 30)
+
+# What each part writes to the profile
+AUDIO_SETTINGS = ("AEC_DELAY_MS", "PLAYER_CHUNK_LENGTH_S", "PLAYER_MIN_BUFFER_S", "CHUNK_SIZE", "RECORDING_SAMPLE_RATE")
+UI_SETTINGS = ("UI_FPS", "UI_RENDER_SCALE")
+
+
+def measure_round_trip(rate=RECORDING_SAMPLE_RATE, repeats=3):
+    """Play a chirp and find it in the recording, returns the median delay in seconds or None"""
+    t = np.arange(int(0.05 * rate)) / rate
+    chirp = 0.5 * np.sin(2 * np.pi * (1000 * t + 70000 * t ** 2)) * np.hanning(len(t))
+    lead = int(0.2 * rate)
+    signal = np.concatenate((np.zeros(lead), chirp, np.zeros(int(0.5 * rate)))).astype(np.float32)
+
+    delays = []
+    for _ in range(repeats):
+        recording = sd.playrec(signal, samplerate=rate, channels=1, dtype="float32",
+                               device=(MIC_INDEX, SPEAKER_INDEX))
+        sd.wait()
+        recorded = recording[:, 0]
+        correlation = np.abs(np.correlate(recorded, chirp, mode="valid"))
+        peak = int(np.argmax(correlation))
+        # Normalised so a quiet but clean echo still counts and noise doesn't
+        energy = np.sqrt(np.sum(chirp ** 2) * np.sum(recorded[peak:peak + len(chirp)] ** 2)) + 1e-12
+        if correlation[peak] / energy > 0.3:
+            delays.append((peak - lead) / rate)
+        time.sleep(0.2)
+
+    if not delays:
+        return None
+    return float(np.median(delays))
+
+
+def measure_stream(stream_class, rate, blocksize, seconds=3.0, **kwargs):
+    """Run an idle callback stream, return underruns/overruns and callback interval jitter"""
+    intervals = LatencyStats("callback interval")
+    glitches = 0
+    last = None
+
+    def callback(*args):
+        nonlocal glitches, last
+        now = time.perf_counter()
+        if last is not None:
+            intervals.add(now - last)
+        last = now
+        status = args[-1]
+        if status.output_underflow or status.input_overflow:
+            glitches += 1
+        if stream_class is sd.OutputStream:
+            args[0].fill(0)
+
+    with stream_class(samplerate=rate, channels=1, dtype="int16", blocksize=blocksize,
+                      latency="low", callback=callback, **kwargs):
+        time.sleep(seconds)
+
+    s = intervals.summary()
+    block_ms = blocksize / rate * 1000
+    return {
+        "block_ms": block_ms,
+        "glitches": glitches,
+        "interval_p99_ms": s.get("p99", 0.0),
+        "jitter_ms": max(0.0, s.get("p99", 0.0) - block_ms),
+    }
+
+
+def measure_reads(chunk, rate=RECORDING_SAMPLE_RATE, seconds=3.0):
+    """Read the mic `chunk` samples at a time the way the session does, return overflows and read interval jitter"""
+    intervals = LatencyStats("read interval")
+    overflows = 0
+    last = None
+
+    # Same blocking stream as the session's mic loop: no callback, default blocksize and latency
+    with sd.InputStream(device=MIC_INDEX, samplerate=rate, channels=1, dtype="int16") as stream:
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            _, overflowed = stream.read(chunk)
+            now = time.perf_counter()
+            if last is not None:
+                intervals.add(now - last)
+            last = now
+            overflows += bool(overflowed)
+
+    s = intervals.summary()
+    block_ms = chunk / rate * 1000
+    return {
+        "block_ms": block_ms,
+        "glitches": overflows,
+        "interval_p99_ms": s.get("p99", 0.0),
+        "jitter_ms": max(0.0, s.get("p99", 0.0) - block_ms),
+    }
+
+
+def stable(result):
+    return result["glitches"] == 0 and result["jitter_ms"] < result["block_ms"] / 2
+
+
+def measure_resampler(chunk, seconds=10.0):
+    """CPU seconds per second of audio for the mic-to-LLM resampler at a given chunk size"""
+    import soxr
+
+    resampler = soxr.ResampleStream(RECORDING_SAMPLE_RATE, LLM_SAMPLE_RATE, 1, dtype="int16")
+    audio = (np.random.default_rng(0).normal(0, 3000, chunk)).astype(np.int16)
+    chunks = int(seconds * RECORDING_SAMPLE_RATE / chunk)
+    start = time.process_time()
+    for _ in range(chunks):
+        resampler.resample_chunk(audio)
+    return (time.process_time() - start) / seconds
+
+
+def supports_capture_rate(rate):
+    try:
+        sd.check_input_settings(device=MIC_INDEX, samplerate=rate, channels=1, dtype="int16")
+        return True
+    except Exception:
+        return False
+
+
+def measure_render(width, height, seconds=2.0):
+    """Worst per-state p95 frame time in ms at each render scale, headless"""
+    import pygame
+    from bench_ui import stage_benchmark
+    from game_ui import GameUI
+
+    results = {}
+    for scale in RENDER_SCALES:
+        ui = GameUI(width, height, fullscreen=False, render_mode="full", render_scale=scale)
+        states = stage_benchmark(ui, seconds)
+        results[scale] = max(stages["frame"]["p95"] for stages in states.values())
+        ui.visualizer.stop()
+        pygame.quit()
+    return results
+
+
+def calibrate_audio(measurements, settings):
+    print("Measuring speaker-to-mic round trip...")
+    delay = measure_round_trip()
+    measurements["round_trip_ms"] = None if delay is None else delay * 1000
+    if delay is None:
+        print("  no echo found, is the speaker audible from the mic? Leaving AEC_DELAY_MS alone")
+    else:
+        print(f"  {delay * 1000:.1f}ms")
+        settings["AEC_DELAY_MS"] = round(delay * 1000)
+
+    print("Measuring playback callback stability...")
+    player = []
+    for block_s in PLAYER_BLOCKS_S:
+        result = measure_stream(sd.OutputStream, LLM_SAMPLE_RATE, int(block_s * LLM_SAMPLE_RATE), device=SPEAKER_INDEX)
+        player.append(result)
+        print(f"  {result['block_ms']:5.0f}ms blocks: {result['glitches']} underruns, {result['jitter_ms']:.1f}ms jitter")
+    measurements["player_blocks"] = player
+    chosen = next((r for r in player if stable(r)), player[-1])
+    settings["PLAYER_CHUNK_LENGTH_S"] = round(chosen["block_ms"] / 1000, 3)
+    # Prebuffer two blocks plus the worst jitter seen, never less than 100ms
+    settings["PLAYER_MIN_BUFFER_S"] = round(max(0.1, 2 * chosen["block_ms"] / 1000 + chosen["jitter_ms"] / 1000), 3)
+
+    print("Measuring mic read timing...")
+    capture = []
+    for chunk in CAPTURE_BLOCKS:
+        result = measure_reads(chunk)
+        capture.append(result)
+        print(f"  {chunk:5d} samples: {result['glitches']} overflows, {result['jitter_ms']:.1f}ms jitter")
+    measurements["capture_blocks"] = capture
+    chosen = next((chunk for chunk, r in zip(CAPTURE_BLOCKS, capture) if stable(r)), CAPTURE_BLOCKS[-1])
+    settings["CHUNK_SIZE"] = chosen
+
+    print("Measuring resampler cost...")
+    cost = measure_resampler(settings["CHUNK_SIZE"])
+    measurements["resampler_cpu"] = cost
+    print(f"  {cost:.2%} CPU at {settings['CHUNK_SIZE']} samples per chunk")
+    # Skip resampling altogether if it's expensive here and the mic can record at the LLM rate
+    if cost > 0.05 and supports_capture_rate(LLM_SAMPLE_RATE):
+        settings["RECORDING_SAMPLE_RATE"] = LLM_SAMPLE_RATE
+
+
+def calibrate_ui(measurements, settings, width, height):
+    print(f"Measuring render frame time at {width}x{height}...")
+    frame_p95 = measure_render(width, height)
+    measurements["render_p95_ms"] = {str(scale): ms for scale, ms in frame_p95.items()}
+    for scale, ms in frame_p95.items():
+        print(f"  scale {scale}: p95 {ms:.2f}ms")
+
+    # Highest frame rate that some scale sustains with 20% headroom, preferring full resolution
+    for fps in FRAME_RATES:
+        fitting = [scale for scale, ms in frame_p95.items() if ms < 0.8 * 1000 / fps]
+        if fitting:
+            settings["UI_FPS"] = fps
+            settings["UI_RENDER_SCALE"] = max(fitting)
+            return
+    settings["UI_FPS"] = FRAME_RATES[-1]
+    settings["UI_RENDER_SCALE"] = "auto"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate SkyAI for this device")
+    parser.add_argument("--output", default=DEVICE_PROFILE, help="profile to write")
+    parser.add_argument("--resolution", default="1920x1080", help="display size as WIDTHxHEIGHT")
+    parser.add_argument("--skip-audio", action="store_true", help="don't touch the audio devices")
+    parser.add_argument("--skip-ui", action="store_true", help="don't measure rendering")
+    parser.add_argument("--dry-run", action="store_true", help="print the profile instead of writing it")
+    args = parser.parse_args()
+
+    measurements = {}
+    settings = {}
+    if os.path.exists(args.output):
+        # Keep what a partial run (--skip-audio / --skip-ui) doesn't re-measure, the rest starts from the defaults
+        with open(args.output) as f:
+            settings = json.load(f).get("settings", {})
+        measured = (() if args.skip_audio else AUDIO_SETTINGS) + (() if args.skip_ui else UI_SETTINGS)
+        settings = {key: value for key, value in settings.items() if key not in measured}
+    test_audio_devices()
+    if not args.skip_audio:
+        calibrate_audio(measurements, settings)
+    if not args.skip_ui:
+        width, height = (int(v) for v in args.resolution.split("x"))
+        calibrate_ui(measurements, settings, width, height)
+
+    profile = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "mic": sd.query_devices(MIC_INDEX)["name"],
+        "speaker": sd.query_devices(SPEAKER_INDEX)["name"],
+        "measurements": measurements,
+        "settings": settings,
+    }
+
+    print()
+    print("Settings:")
+    for key, value in settings.items():
+        print(f"  {key} = {value!r}")
+    if args.dry_run:
+        print(json.dumps(profile, indent=2))
+        return
+    with open(args.output, "w") as f:
+        json.dump(profile, f, indent=2)
+    print(f"Wrote {args.output}, delete it to go back to the defaults in config.py")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import json
 import os
 from dotenv import load_dotenv
 
@@ -24,4 +25,79 @@ SESSION_CONFIG = {
 RECORDING_SAMPLE_RATE = 48000
 LLM_SAMPLE_RATE = 24000
 CHUNK_SIZE = 1024
-CONVERSATION_TIMEOUT = 10  # seconds 
\ No newline at end of file
+CONVERSATION_TIMEOUT = 10  # seconds, "fixed" policy limit and upper bound for "speech"
+CONVERSATION_POLICY = "speech"  # "speech" ends on silence and extends while talking, "fixed" uses the timeout
+CONVERSATION_SILENCE_S = 4.0  # end this long after the last response when nobody is talking
+CONVERSATION_RESPONSE_WAIT_S = 8.0  # how long to wait for a reply once the user stops talking
+CONVERSATION_MAX_SPEECH_S = 30.0  # stop extending if the server never reports speech_stopped
+CONVERSATION_VOICE_DB = 10.0  # mic level above the noise floor that counts as someone talking
+PLAYER_CHUNK_LENGTH_S = 0.1  # playback callback block, larger is more robust to scheduling hiccups
+PLAYER_MIN_BUFFER_S = 0.2  # audio queued before playback starts, prevents underruns
+
+# Local functions the assistant can call (tools.py)
+TOOLS_ENABLED = True
+TOOL_WORKERS = 4  # thread pool size for sync tools
+TOOL_TIMEOUT_S = 5.0  # default per-call timeout
+
+# Reconnect when the realtime connection drops (connection_manager.py)
+RECONNECT_BASE_S = 0.5  # first retry delay, doubles every attempt, randomised
+RECONNECT_MAX_S = 8.0  # longest delay between two attempts
+RECONNECT_GIVE_UP_S = 30.0  # end the conversation if the connection stays down this long
+RECONNECT_STABLE_S = 5.0  # a connection has to stay up this long before the backoff starts over
+RECONNECT_BUFFER_S = 10.0  # mic audio kept while reconnecting and sent once the connection is back
+RECONNECT_CONTEXT_ITEMS = 20  # recent conversation items restored on the new session
+RECONNECT_TRANSCRIBE_MODEL = "whisper-1"  # transcribes the user's turns so they can be restored, None drops them
+
+# Prometheus metrics for fleet monitoring (metrics.py)
+METRICS_PORT = None  # e.g. 9108 to serve /metrics, None disables
+METRICS_HOST = "127.0.0.1"  # "0.0.0.0" to let a scraper on the network reach it
+
+# Recover from stalled event/render loops (watchdog.py)
+WATCHDOG_ENABLED = True
+WATCHDOG_STALL_S = 2.0  # a loop that hasn't checked in for this long is stalled
+# Recovery steps per watched loop, each stall of that loop moves on to the next. The render loop
+# is the main thread and owns the display, nothing else can rebuild the UI while it is stuck
+WATCHDOG_ESCALATION = {"session loop": ("session", "exec"), "render loop": ("exec",)}
+WATCHDOG_GRACE_S = 5.0  # time a step gets to work before a stall that persists takes the next one
+WATCHDOG_RESET_S = 600.0  # this long without a recovery starts the escalation over
+
+# Wake word energy pre-filter (skips Porcupine on silent frames)
+WAKE_GATE_ENABLED = True
+WAKE_GATE_THRESHOLD_DB = 6.0  # dB above the adaptive noise floor that counts as activity
+WAKE_GATE_MIN_DB = 30.0  # absolute energy floor, frames below this are always silence
+WAKE_GATE_LOOKBACK_FRAMES = 12  # ~380ms of audio replayed to Porcupine on onset
+WAKE_GATE_HANGOVER_FRAMES = 16  # frames kept open after activity drops
+PREROLL_SECONDS = 5.0  # wake mic audio kept so words spoken right after the wake word reach the session, 0 disables
+
+# Full-duplex mode: keep the mic open during playback and cancel the speaker echo
+FULL_DUPLEX = False
+AEC_BLOCK_SIZE = 256  # samples at LLM_SAMPLE_RATE per canceller block
+AEC_FILTER_MS = 128  # echo tail covered by the adaptive filter
+AEC_DELAY_MS = None  # speaker-to-mic delay, None estimates it from the stream latencies
+AEC_STEP_SIZE = 0.5  # NLMS step size, lower is slower but more robust to double-talk
+
+# Run the wake engine in its own process (main_ui.py --wake-process)
+WAKE_IN_PROCESS = False
+WAKE_RING_FRAMES = 64  # shared memory ring depth, ~2s of 512-sample frames
+
+# UI rendering
+UI_FPS = 60
+UI_IDLE_FPS = 10  # frame rate while listening with nothing animating
+UI_ACTIVE_HOLD = 2.0  # seconds to stay at full frame rate after a state change or audio
+UI_RENDER_MODE = "dirty"  # "dirty" only redraws changed regions when idle, "full" redraws every frame
+UI_RENDER_SCALE = 1.0  # internal resolution as a fraction of the display, or "auto" to follow frame time
+UI_RENDER_SCALE_MIN = 0.5  # lowest scale "auto" will drop to
+UI_SMOOTH_SCALE = False  # bilinear upscale, looks softer but costs ~7x nearest-neighbour at 4K
+VIS_MODE = "waveform"  # audio visualization, "waveform" (RMS envelope) or "spectrum", V toggles
+CAPTIONS_ENABLED = True  # live captions of the assistant's speech
+CAPTION_LINES = 3  # caption lines on screen
+TRANSCRIPT_HISTORY = 200  # caption lines kept in memory
+
+
+# Per-device overrides measured by calibrate.py, applied on top of the defaults above, SKYAI_PROFILE="" for none
+DEVICE_PROFILE = os.getenv('SKYAI_PROFILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'device_profile.json'))
+if DEVICE_PROFILE and os.path.exists(DEVICE_PROFILE):
+    with open(DEVICE_PROFILE) as f:
+        _settings = json.load(f).get("settings", {})
+    globals().update({key: value for key, value in _settings.items() if key.isupper() and key in globals()})
+    print(f"Loaded device profile {DEVICE_PROFILE}: {', '.join(sorted(_settings))}")
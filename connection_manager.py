@@ -0,0 +1,198 @@
+import asyncio
+import base64
+import random
+import time
+from collections import deque
+from websockets.exceptions import WebSocketException
+from config import (
+    LLM_SAMPLE_RATE,
+    RECONNECT_BASE_S,
+    RECONNECT_MAX_S,
+    RECONNECT_GIVE_UP_S,
+    RECONNECT_STABLE_S,
+    RECONNECT_BUFFER_S,
+    RECONNECT_CONTEXT_ITEMS,
+    RECONNECT_TRANSCRIBE_MODEL,
+)
+from perf_stats import LatencyStats
+from metrics import uplink_bytes
+
+# What a dropped or unreachable realtime connection raises
+CONNECTION_ERRORS = (WebSocketException, OSError, asyncio.TimeoutError)
+
+
+class ConnectionStats:
+    """Totals across sessions: outages, how long they lasted and how many sessions survived them."""
+    def __init__(self):
+        self.outages = 0
+        self.recovered = 0
+        self.failed = 0
+        self.replayed_seconds = 0.0
+        self.dropped_seconds = 0.0
+        self.outage_stats = LatencyStats("Reconnect outage")
+
+    def report(self):
+        return (f"Connection: outages={self.outages} recovered={self.recovered} failed={self.failed} "
+                f"replayed={self.replayed_seconds:.1f}s dropped={self.dropped_seconds:.1f}s\n"
+                f"{self.outage_stats.report()}")
+
+
+connection_stats = ConnectionStats()
+
+
+class ConnectionManager:
+    """Realtime API connection that survives network blips.
+
+    events() yields (conn, event) like iterating the connection directly,
+    but when the socket drops it reconnects with jittered exponential
+    backoff and carries on. Mic audio goes through append(): while the
+    connection is down it is kept in a buffer bounded to RECONNECT_BUFFER_S
+    (oldest audio is dropped first) and replayed in order once the new
+    session is up. The new session gets the same session.update plus the
+    last RECONNECT_CONTEXT_ITEMS conversation items, rebuilt from the
+    transcripts and function calls seen so far. The user's turns only have
+    a transcript if the session transcribes its input, so that is turned on
+    with RECONNECT_TRANSCRIBE_MODEL unless the config already sets it. After RECONNECT_GIVE_UP_S
+    without a connection events() raises ConnectionError; a connection only
+    ends the outage once it has stayed up for RECONNECT_STABLE_S, so a
+    server that accepts and drops right away can't keep it going forever.
+    """
+    def __init__(self, client, model, session_config, on_reconnect=None):
+        self.client = client
+        self.model = model
+        if RECONNECT_TRANSCRIBE_MODEL and "input_audio_transcription" not in session_config:
+            session_config = dict(session_config, input_audio_transcription={"model": RECONNECT_TRANSCRIBE_MODEL})
+        self.session_config = session_config
+        self.on_reconnect = on_reconnect  # called after a session is resumed, the response in flight is lost
+        self.connection = None
+        self.connected = asyncio.Event()
+        self.closed = False
+        self.uplink = deque()  # raw audio chunks waiting for a connection
+        self.uplink_bytes = 0
+        self.context = deque(maxlen=RECONNECT_CONTEXT_ITEMS)
+
+    async def append(self, audio):
+        """Send int16 audio at LLM_SAMPLE_RATE, or buffer it until the connection is back"""
+        if self.connected.is_set():
+            try:
+                await self.connection.input_audio_buffer.append(audio=base64.b64encode(audio).decode("utf-8"))
+                uplink_bytes.inc(audio.nbytes)
+                return
+            except CONNECTION_ERRORS:
+                # events() notices the drop too and reconnects
+                self.connected.clear()
+        self._buffer(audio.tobytes())
+
+    def _buffer(self, data):
+        self.uplink.append(data)
+        self.uplink_bytes += len(data)
+        limit = RECONNECT_BUFFER_S * LLM_SAMPLE_RATE * 2
+        while self.uplink_bytes > limit:
+            dropped = self.uplink.popleft()
+            self.uplink_bytes -= len(dropped)
+            connection_stats.dropped_seconds += len(dropped) / 2 / LLM_SAMPLE_RATE
+
+    async def events(self):
+        """Yield (conn, event) across reconnects until close()"""
+        resumed = False
+        down_since = None
+        attempt = 0
+        opened_at = None
+        was_up = False  # the current outage interrupted a session, rather than the first connect
+        while not self.closed:
+            try:
+                async with self.client.beta.realtime.connect(model=self.model) as conn:
+                    await self._open(conn, resumed)
+                    opened_at = time.monotonic()
+                    if resumed and self.on_reconnect:
+                        self.on_reconnect()
+                    resumed = True
+                    async for event in conn:
+                        if down_since is not None and time.monotonic() - opened_at >= RECONNECT_STABLE_S:
+                            if was_up:
+                                self._recovered(opened_at - down_since)
+                            down_since = None
+                            attempt = 0
+                        self._remember(event)
+                        yield conn, event
+                    # The server closed the socket cleanly, still a drop from our side
+            except CONNECTION_ERRORS as e:
+                print(f"Realtime connection lost: {type(e).__name__}: {e}")
+            finally:
+                self.connected.clear()
+                self.connection = None
+            if self.closed:
+                break
+
+            now = time.monotonic()
+            if down_since is not None and opened_at is not None and now - opened_at >= RECONNECT_STABLE_S:
+                # Stayed up long enough without server events to show it, that outage is over
+                if was_up:
+                    self._recovered(opened_at - down_since)
+                down_since = None
+                attempt = 0
+            opened_at = None
+            if down_since is None:
+                down_since = now
+                was_up = resumed
+                if resumed:
+                    connection_stats.outages += 1
+            elif now - down_since > RECONNECT_GIVE_UP_S:
+                connection_stats.failed += 1
+                raise ConnectionError(f"realtime connection down for {now - down_since:.0f}s, giving up")
+            # Full jitter, so devices that lost the same network don't reconnect in lockstep
+            delay = random.uniform(0, min(RECONNECT_MAX_S, RECONNECT_BASE_S * 2 ** attempt))
+            attempt += 1
+            print(f"Reconnecting in {delay:.2f}s (attempt {attempt})")
+            await asyncio.sleep(delay)
+
+    def _recovered(self, outage):
+        connection_stats.recovered += 1
+        connection_stats.outage_stats.add(outage)
+        print(f"Realtime connection recovered after {outage:.1f}s")
+
+    async def _open(self, conn, resumed):
+        """Configure a new session, restore the conversation and flush buffered audio"""
+        await conn.session.update(session=self.session_config)
+        if resumed:
+            for item in self.context:
+                await conn.conversation.item.create(item=item)
+        self.connection = conn
+        # Audio appended while this runs is buffered too and goes out in order
+        while self.uplink:
+            data = self.uplink.popleft()
+            try:
+                await conn.input_audio_buffer.append(audio=base64.b64encode(data).decode("utf-8"))
+            except CONNECTION_ERRORS:
+                self.uplink.appendleft(data)
+                raise
+            self.uplink_bytes -= len(data)
+            uplink_bytes.inc(len(data))
+            if resumed:
+                connection_stats.replayed_seconds += len(data) / 2 / LLM_SAMPLE_RATE
+        self.connected.set()
+
+    def _remember(self, event):
+        """Keep the finished turns so a new session can be given the conversation so far"""
+        if event.type == "conversation.item.input_audio_transcription.completed":
+            self.context.append({"type": "message", "role": "user",
+                                 "content": [{"type": "input_text", "text": event.transcript}]})
+        elif event.type == "response.audio_transcript.done":
+            self.context.append({"type": "message", "role": "assistant",
+                                 "content": [{"type": "text", "text": event.transcript}]})
+        elif event.type == "response.output_item.done" and event.item.type == "function_call":
+            self.context.append({"type": "function_call", "call_id": event.item.call_id,
+                                 "name": event.item.name, "arguments": event.item.arguments})
+        elif event.type == "conversation.item.created" and event.item.type == "function_call_output":
+            # The items _open restores are echoed back as created too, keep one output per call
+            if any(item["type"] == "function_call_output" and item["call_id"] == event.item.call_id
+                   for item in self.context):
+                return
+            self.context.append({"type": "function_call_output", "call_id": event.item.call_id,
+                                 "output": event.item.output})
+
+    async def close(self):
+        self.closed = True
+        self.connected.clear()
+        if self.connection:
+            await self.connection.close()
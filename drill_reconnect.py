@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Network-blip drill for ConnectionManager.
+
+Usage:
+    python3 drill_reconnect.py [--seconds N] [--drop-every S] [--refuse N]
+
+Runs a local stand-in for the realtime API that drops every connection
+after --drop-every seconds, alternating between an abrupt reset and a
+server-side close, and refuses the next --refuse connection attempts so the
+backoff is exercised. Meanwhile a producer streams numbered mic chunks in
+real time through ConnectionManager.append(), and the server answers every
+two seconds of it so there is conversation context to restore, and the drill
+hands in a function call output on every connection. At the end it checks
+that the server received the chunks once each and in order, that each
+resumed session got session.update plus the context with the user's turns
+in it and no function call output twice, and prints the outage statistics.
+A chunk already on the wire when the connection is reset cannot be told
+apart from a delivered one, so one per reset may go missing. Needs nothing
+but the openai[realtime] requirement.
+"""
+
+import argparse
+import asyncio
+
+import numpy as np
+from openai import AsyncOpenAI
+from websockets.asyncio.server import serve
+
+from config import SESSION_CONFIG
+from connection_manager import ConnectionManager, connection_stats
+from standin_server import StandInServer
+
+CHUNK_SAMPLES = 480  # 20ms at 24kHz
+TONE = (3000 * np.sin(2 * np.pi * 200 * np.arange(CHUNK_SAMPLES) / 24000)).astype(np.int16)
+
+
+class DrillServer(StandInServer):
+    """Records the number carried by each chunk, in arrival order"""
+    def __init__(self, drop_every, refuse):
+        super().__init__(drop_every=drop_every, refuse=refuse, respond_after=2.0, response_s=0.2)
+        self.received = []
+
+    def on_audio(self, audio):
+        for start in range(0, len(audio), CHUNK_SAMPLES):
+            self.received.append(int(audio[start]) * 32768 + int(audio[start + 1]))
+
+
+async def produce(link, seconds):
+    """Stream numbered 20ms chunks in real time, like the mic loop does"""
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    count = int(seconds * 50)
+    for number in range(count):
+        chunk = TONE.copy()
+        chunk[0], chunk[1] = divmod(number, 32768)
+        await link.append(chunk)
+        await asyncio.sleep(max(0.0, start + (number + 1) / 50 - loop.time()))
+    return count
+
+
+async def drill(args):
+    server = DrillServer(args.drop_every, args.refuse)
+    async with serve(server.handle, "127.0.0.1", 0, process_request=server.process_request) as ws_server:
+        port = ws_server.sockets[0].getsockname()[1]
+        client = AsyncOpenAI(api_key="drill", websocket_base_url=f"ws://127.0.0.1:{port}/v1")
+        link = ConnectionManager(client, "drill", SESSION_CONFIG)
+
+        async def consume():
+            # The context is rebuilt from the transcripts passing through here
+            answered = set()
+            async for conn, event in link.events():
+                if event.type == "response.done" and conn not in answered:
+                    # Like a tool's result, the server echoes it back on every session it is restored to
+                    answered.add(conn)
+                    await conn.conversation.item.create(item={"type": "function_call_output",
+                                                              "call_id": f"drill_{len(answered)}", "output": "{}"})
+
+        consumer = asyncio.create_task(consume())
+        sent = await produce(link, args.seconds)
+        await link.connected.wait()  # last reconnect flushes what is still buffered
+        await asyncio.sleep(0.5)
+        await link.close()
+        await consumer
+
+    received = server.received
+    missing = sorted(set(range(sent)) - set(received))
+    duplicates = len(received) - len(set(received))
+    in_order = received == sorted(received)
+    print(f"Sessions: {server.sessions}, session.update sent {server.session_updates} times")
+    print(f"Context items restored per session: {server.context_items}")
+    resumed = server.restored[1:]
+    users = [sum(item.get("role") == "user" for item in items) for items in resumed]
+    calls = [[item["call_id"] for item in items if item["type"] == "function_call_output"] for items in resumed]
+    print(f"User turns restored per resumed session: {users}, function call outputs: {calls}")
+    print(f"Chunks: sent={sent} received={len(received)} missing={len(missing)} "
+          f"duplicates={duplicates} in_order={in_order}, {server.aborts} connection resets")
+    print(connection_stats.report())
+    ok = (len(missing) <= server.aborts and not duplicates and in_order
+          and server.session_updates == server.sessions and all(server.context_items[1:])
+          and all(users) and all(len(ids) == len(set(ids)) for ids in calls))
+    print("PASS" if ok else "FAIL")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drop the realtime connection on purpose and check recovery")
+    parser.add_argument("--seconds", type=float, default=40.0, help="how long to stream audio")
+    parser.add_argument("--drop-every", type=float, default=8.0, help="seconds each connection lives")
+    parser.add_argument("--refuse", type=int, default=2, help="connection attempts refused after each drop")
+    args = parser.parse_args()
+    raise SystemExit(0 if asyncio.run(drill(args)) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import threading
+import numpy as np
+from config import (
+    LLM_SAMPLE_RATE,
+    AEC_BLOCK_SIZE,
+    AEC_FILTER_MS,
+    AEC_DELAY_MS,
+    AEC_STEP_SIZE,
+)
+
+
+class ReferenceBuffer:
+    """FIFO of speaker samples shared between the player callback and the capture path.
+
+    Samples are paired with the microphone by count, so the buffer is primed
+    with the speaker-to-mic delay whenever playback (re)starts.
+    """
+    def __init__(self, sample_rate=LLM_SAMPLE_RATE, max_seconds=2.0):
+        self.sample_rate = sample_rate
+        self.max_samples = int(max_seconds * sample_rate)
+        self.input_latency = 0.0  # set by the capture side once its stream is open
+        self.queue = []
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def restart(self, output_latency=0.0):
+        """Clear the buffer and prime it with the estimated echo delay."""
+        if AEC_DELAY_MS is not None:
+            delay = AEC_DELAY_MS / 1000
+        else:
+            delay = output_latency + self.input_latency
+        padding = np.zeros(int(delay * self.sample_rate), dtype=np.int16)
+        with self.lock:
+            self.queue = [padding]
+            self.size = len(padding)
+
+    def write(self, samples):
+        """Called from the audio callback with what was just handed to the speaker."""
+        with self.lock:
+            self.queue.append(samples.copy())
+            self.size += len(samples)
+            # Drop the oldest audio if the capture side stopped reading
+            while self.size > self.max_samples and self.queue:
+                self.size -= len(self.queue.pop(0))
+
+    def read(self, frames):
+        """Return the next `frames` samples, zero-filled when nothing was played."""
+        out = np.zeros(frames, dtype=np.int16)
+        filled = 0
+        with self.lock:
+            while filled < frames and self.queue:
+                item = self.queue.pop(0)
+                take = min(frames - filled, len(item))
+                out[filled:filled + take] = item[:take]
+                if take < len(item):
+                    self.queue.insert(0, item[take:])
+                filled += take
+            self.size -= filled
+        return out
+
+
+class EchoCanceller:
+    """Partitioned-block frequency-domain NLMS echo canceller.
+
+    Removes the speaker signal (read from a ReferenceBuffer) from the
+    microphone so the mic can keep streaming while the assistant talks.
+    Works on int16 audio at LLM_SAMPLE_RATE in blocks of AEC_BLOCK_SIZE.
+    """
+    def __init__(self, reference: ReferenceBuffer, block_size=AEC_BLOCK_SIZE,
+                 filter_ms=AEC_FILTER_MS, step_size=AEC_STEP_SIZE):
+        self.reference = reference
+        self.block_size = block_size
+        self.step_size = step_size
+        self.partitions = max(1, int(np.ceil(filter_ms / 1000 * reference.sample_rate / block_size)))
+        bins = block_size + 1
+
+        # Filter weights and reference spectra, one row per partition
+        self.weights = np.zeros((self.partitions, bins), dtype=np.complex128)
+        self.x_history = np.zeros((self.partitions, bins), dtype=np.complex128)
+        self.x_power = np.full(bins, 1e-3)
+        self.prev_x = np.zeros(block_size)
+        self.pending = np.zeros(0, dtype=np.int16)
+
+    def reset(self):
+        self.weights[:] = 0
+        self.x_history[:] = 0
+        self.x_power[:] = 1e-3
+        self.prev_x[:] = 0
+        self.pending = np.zeros(0, dtype=np.int16)
+
+    def process(self, mic):
+        """Cancel echo in a chunk of int16 mic samples.
+
+        Audio is processed in whole blocks, so the output may be up to one
+        block shorter or longer than the input.
+        """
+        self.pending = np.concatenate((self.pending, mic))
+        blocks = len(self.pending) // self.block_size
+        if blocks == 0:
+            return np.zeros(0, dtype=np.int16)
+
+        used = blocks * self.block_size
+        near = self.pending[:used].astype(np.float64) / 32768.0
+        far = self.reference.read(used).astype(np.float64) / 32768.0
+        self.pending = self.pending[used:]
+
+        out = np.empty(used)
+        for b in range(blocks):
+            s = slice(b * self.block_size, (b + 1) * self.block_size)
+            out[s] = self._process_block(near[s], far[s])
+        return (np.clip(out, -1.0, 1.0) * 32767).astype(np.int16)
+
+    def _process_block(self, d, x):
+        B = self.block_size
+
+        # Shift in the spectrum of the newest reference block (overlap-save)
+        X = np.fft.rfft(np.concatenate((self.prev_x, x)))
+        self.prev_x = x
+        self.x_history = np.roll(self.x_history, 1, axis=0)
+        self.x_history[0] = X
+
+        # Echo estimate and residual
+        y = np.fft.irfft((self.x_history * self.weights).sum(axis=0))[B:]
+        e = d - y
+
+        # Only adapt while something is being played
+        if np.any(x):
+            self.x_power = 0.9 * self.x_power + 0.1 * (np.abs(X) ** 2)
+            E = np.fft.rfft(np.concatenate((np.zeros(B), e)))
+            # Normalise by reference power and the number of partitions sharing the step
+            gradient = np.conj(self.x_history) * (E / (self.x_power * self.partitions + 1e-6))
+
+            # Keep the gradient causal by zeroing the circular half of each partition
+            g = np.fft.irfft(gradient, axis=1)
+            g[:, B:] = 0
+            self.weights += self.step_size * np.fft.rfft(g, axis=1)
+
+        # Guard against divergence during double-talk, never add energy
+        if np.dot(e, e) > np.dot(d, d):
+            return d
+        return e
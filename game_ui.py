@@ -3,8 +3,25 @@ import math
 import time
 import threading
 import numpy as np
+from collections import OrderedDict, deque
 from datetime import datetime
 from enum import Enum
+from config import (
+    UI_FPS,
+    UI_IDLE_FPS,
+    UI_ACTIVE_HOLD,
+    UI_RENDER_MODE,
+    UI_RENDER_SCALE,
+    UI_RENDER_SCALE_MIN,
+    UI_SMOOTH_SCALE,
+    CAPTIONS_ENABLED,
+    CAPTION_LINES,
+    TRANSCRIPT_HISTORY,
+    RECORDING_SAMPLE_RATE,
+)
+from transcript import Transcript
+from metrics import frame_time
+from visualizer import AudioVisualizer
 
 
 class UIState(Enum):
@@ -28,65 +45,256 @@ class Colors:
     GRAY = (100, 100, 100)
 
 
-class Particle:
-    def __init__(self, x, y, vx, vy, color, lifetime):
-        self.x = x
-        self.y = y
-        self.vx = vx
-        self.vy = vy
-        self.color = color
-        self.lifetime = lifetime
-        self.max_lifetime = lifetime
-        self.size = 2
+class UIStateChannel:
+    """Lock-free hand-off of state changes to the render thread.
+    
+    Producers (session and wake threads) never touch render state. State
+    changes and transcript deltas go through deques, whose append and
+    popleft are atomic, so none are lost between two frames. The renderer
+    consumes them once per frame. Audio takes the same route through
+    AudioVisualizer, whose worker publishes one snapshot per frame.
+    """
+    
+    def __init__(self):
+        self.transitions = deque(maxlen=16)
+        self.transcript = deque(maxlen=1024)
+    
+    def publish_state(self, state):
+        self.transitions.append(state)
+    
+    def publish_transcript(self, delta):
+        """Queue a transcript delta, None ends the turn"""
+        self.transcript.append(delta)
+    
+    def consume_transcript(self):
+        deltas = []
+        while self.transcript:
+            deltas.append(self.transcript.popleft())
+        return deltas
+    
+    def consume(self):
+        """Return the state transitions published since the last call"""
+        transitions = []
+        while self.transitions:
+            transitions.append(self.transitions.popleft())
+        return transitions
+
+
+class SpriteCache:
+    """Bounded LRU cache of pre-rendered surfaces, built lazily on first use"""
+    
+    def __init__(self, max_size=64):
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def __len__(self):
+        return len(self.surfaces)
+    
+    def get(self, key, build):
+        """Return the surface for `key`, calling `build()` to render it on a miss"""
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        
+        self.misses += 1
+        surface = build()
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+    
+    def put(self, key, surface):
+        """Add a surface built ahead of time, keeping one the render thread already built"""
+        if key not in self.surfaces:
+            self.surfaces[key] = surface
+            if len(self.surfaces) > self.max_size:
+                self.surfaces.popitem(last=False)
+    
+    def clear(self):
+        self.surfaces.clear()
+
+
+class TextCache(SpriteCache):
+    """Rendered text surfaces keyed by string, font and color.
+    
+    Use this for all on-screen text: status lines and the clock only change
+    a few times a minute, so they should never be re-rendered every frame.
+    """
+    
+    def render(self, text, font, color, antialias=True):
+        return self.get((text, font, color, antialias), lambda: font.render(text, antialias, color))
+
+
+def radial_sprite(color, half_size, alpha_fn):
+    """Render a per-pixel-alpha sprite whose alpha is a function of distance from the center"""
+    size = half_size * 2 + 1
+    surface = pygame.Surface((size, size), pygame.SRCALPHA)
+    surface.fill((*color[:3], 0))
+    
+    coords = np.arange(size) - half_size
+    distance = np.hypot(coords[:, None], coords[None, :])
+    alpha = pygame.surfarray.pixels_alpha(surface)
+    alpha[:] = np.clip(alpha_fn(distance), 0, 255).astype(np.uint8)
+    del alpha  # unlock the surface
+    # RLE skips the fully transparent runs, which make up most of a glow sprite
+    surface.set_alpha(255, pygame.RLEACCEL)
+    return surface
+
+
+def glow_sprite(color, half_size, alpha_fn):
+    """Render an opaque sprite of `color` premultiplied by a function of distance, for blitting with BLEND_RGB_ADD.
+    
+    Adding light is how a glow looks anyway, and the add blitter is SIMD:
+    about half the cost of blending the same sprite with per-pixel alpha.
+    It costs the same for every pixel of the sprite though, so keep it tight.
+    """
+    size = half_size * 2 + 1
+    coords = np.arange(size) - half_size
+    distance = np.hypot(coords[:, None], coords[None, :])
+    alpha = np.clip(alpha_fn(distance), 0, 255) / 255
+    surface = pygame.Surface((size, size), 0, 32)
+    pygame.surfarray.blit_array(surface, (alpha[:, :, None] * color[:3]).astype(np.uint8))
+    return surface
+
+
+class ParticleSystem:
+    """Struct-of-arrays particle system.
+
+    Positions, velocities, lifetimes and colors live in NumPy arrays that are
+    updated with vectorized ops; dead particles are compacted in bulk and
+    the survivors are drawn with one batched blit of pre-rendered sprites.
+    """
+    ALPHA_LEVELS = 16
+    
+    def __init__(self, capacity=4096, size=2):
+        self.capacity = capacity
+        self.size = size
+        self.count = 0
+        self.pos = np.zeros((capacity, 2), dtype=np.float32)
+        self.vel = np.zeros((capacity, 2), dtype=np.float32)
+        self.lifetime = np.zeros(capacity, dtype=np.float32)
+        self.max_lifetime = np.ones(capacity, dtype=np.float32)
+        self.color_index = np.zeros(capacity, dtype=np.int32)
+        self.rng = np.random.default_rng()
+        
+        # Sprites indexed by (color, size, alpha level), rendered once per color
+        self.colors = []
+        self.sprites = []
+    
+    def __len__(self):
+        return self.count
+    
+    def _color_index(self, color):
+        """Get the index of a color, pre-rendering its sprites on first use"""
+        if color in self.colors:
+            return self.colors.index(color)
+        self.colors.append(color)
+        for radius in range(1, self.size + 1):
+            for level in range(self.ALPHA_LEVELS):
+                alpha = int(255 * (level + 1) / self.ALPHA_LEVELS)
+                sprite = pygame.Surface((radius * 2 + 1, radius * 2 + 1), pygame.SRCALPHA)
+                pygame.draw.circle(sprite, (*color[:3], alpha), (radius, radius), radius)
+                self.sprites.append(sprite)
+        return len(self.colors) - 1
+    
+    def rescale(self, factor):
+        """Move live particles onto a surface `factor` times the size of the old one"""
+        n = self.count
+        self.pos[:n] *= factor
+        self.vel[:n] *= factor
+    
+    def emit(self, x, y, count, color, speed=(50, 200), lifetime=(1.0, 2.0)):
+        """Spawn a radial burst of particles"""
+        count = min(count, self.capacity - self.count)
+        if count <= 0:
+            return
+        new = slice(self.count, self.count + count)
+        angle = self.rng.uniform(0, 2 * np.pi, count)
+        velocity = self.rng.uniform(*speed, count)
+        self.pos[new] = (x, y)
+        self.vel[new, 0] = np.cos(angle) * velocity
+        self.vel[new, 1] = np.sin(angle) * velocity
+        self.lifetime[new] = self.rng.uniform(*lifetime, count)
+        self.max_lifetime[new] = self.lifetime[new]
+        self.color_index[new] = self._color_index(color)
+        self.count += count
     
     def update(self, dt):
-        self.x += self.vx * dt
-        self.y += self.vy * dt
-        self.lifetime -= dt
-        self.size = max(1, int(self.size * (self.lifetime / self.max_lifetime)))
+        """Move all particles and drop the dead ones"""
+        n = self.count
+        if n == 0:
+            return
+        self.pos[:n] += self.vel[:n] * dt
+        self.lifetime[:n] -= dt
+        
+        alive = self.lifetime[:n] > 0
+        if not alive.all():
+            keep = np.flatnonzero(alive)
+            for array in (self.pos, self.vel, self.lifetime, self.max_lifetime, self.color_index):
+                array[:len(keep)] = array[keep]
+            self.count = len(keep)
     
     def draw(self, screen):
-        if self.lifetime > 0:
-            alpha = int(255 * (self.lifetime / self.max_lifetime))
-            color = (*self.color[:3], alpha)
-            pygame.draw.circle(screen, color, (int(self.x), int(self.y)), self.size)
+        """Draw all particles, fading and shrinking with their remaining lifetime"""
+        n = self.count
+        if n == 0:
+            return
+        fraction = self.lifetime[:n] / self.max_lifetime[:n]
+        radius = np.clip(np.ceil(self.size * fraction), 1, self.size).astype(np.int32)
+        level = np.minimum((fraction * self.ALPHA_LEVELS).astype(np.int32), self.ALPHA_LEVELS - 1)
+        sprite_index = (self.color_index[:n] * self.size + radius - 1) * self.ALPHA_LEVELS + level
+        topleft = (self.pos[:n] - radius[:, None]).astype(np.int32)
+        
+        sprites = self.sprites
+        screen.blits([(sprites[i], xy) for i, xy in zip(sprite_index.tolist(), topleft.tolist())], False)
+    
+    def clear(self):
+        self.count = 0
 
 
 class GameUI:
-    def __init__(self, width=1920, height=1080, fullscreen=True):
-        pygame.init()
-        pygame.mixer.init()
+    # States where nothing but the clock and the breathing core changes
+    IDLE_STATES = (UIState.LISTENING, UIState.IDLE)
+    # Internal resolutions "auto" render scale steps through
+    AUTO_SCALES = (1.0, 0.75, 0.5, 0.375, 0.25)
+    
+    def __init__(self, width=1920, height=1080, fullscreen=True, render_mode=UI_RENDER_MODE,
+                 render_scale=UI_RENDER_SCALE):
+        # Only what the UI uses; pygame.init() would also open an audio device for the mixer
+        pygame.display.init()
+        pygame.font.init()
         
         # Get actual display size
         info = pygame.display.Info()
         if fullscreen:
-            self.width = info.current_w
-            self.height = info.current_h
+            self.display_width = info.current_w
+            self.display_height = info.current_h
         else:
-            self.width = width
-            self.height = height
-        
-        self.center_x = self.width // 2
-        self.center_y = self.height // 2
+            self.display_width = width
+            self.display_height = height
         
         # Set up display with proper fullscreen flags
         if fullscreen:
             # Try different fullscreen methods for better compatibility
             try:
                 # Method 1: Hardware fullscreen
-                self.screen = pygame.display.set_mode((self.width, self.height), 
+                self.display = pygame.display.set_mode((self.display_width, self.display_height), 
                                                     pygame.FULLSCREEN | pygame.HWSURFACE | pygame.DOUBLEBUF)
             except:
                 try:
                     # Method 2: Desktop fullscreen (borderless window)
-                    self.screen = pygame.display.set_mode((self.width, self.height), 
+                    self.display = pygame.display.set_mode((self.display_width, self.display_height), 
                                                         pygame.NOFRAME)
                 except:
                     # Method 3: Fallback to regular fullscreen
-                    self.screen = pygame.display.set_mode((self.width, self.height), 
+                    self.display = pygame.display.set_mode((self.display_width, self.display_height), 
                                                         pygame.FULLSCREEN)
         else:
-            self.screen = pygame.display.set_mode((self.width, self.height))
+            self.display = pygame.display.set_mode((self.display_width, self.display_height))
         
         pygame.display.set_caption("SkyAI Voice Assistant")
         pygame.mouse.set_visible(False)
@@ -98,26 +306,128 @@ class GameUI:
         # Animation variables
         self.time = 0
         self.pulse_intensity = 0
-        self.wave_data = np.zeros(128)
-        self.particles = []
+        self.visualizer = AudioVisualizer()
+        self.vis_sequence = 0
+        self.vis_points = []
+        self.vis_closed = True
+        self.particles = ParticleSystem()
+        
+        # Background grid, pre-rendered per resolution and scrolled with a blit
+        self.grid_cache = {}
+        self.grid_time = 0  # only advances on full frames, the grid holds still when idle
+        
+        # Dirty-rectangle rendering and adaptive frame rate
+        self.render_mode = render_mode
+        self.dirty_rects = []
+        self.last_activity = time.time()
+        
+        # Orb glow and core sprites, keyed by color and quantized radius, sized to hold every key
+        self.orb_sprites = SpriteCache()
+        self.orb_radius_step = 4
+        self.orb_prewarmed = None  # (render scale, sprites) built off the render thread
         
         # Colors and gradients
         self.bg_color = Colors.BLACK
         self.orb_color = Colors.CYAN
         self.wave_color = Colors.BLUE
         
-        # Fonts
-        self.font_large = pygame.font.Font(None, 72)
-        self.font_medium = pygame.font.Font(None, 48)
-        self.font_small = pygame.font.Font(None, 32)
+        self.text_cache = TextCache(max_size=256)
         
         # UI state callbacks
         self.state_callbacks = {}
         
+        # Updates from other threads, applied on the render thread once per frame
+        self.channel = UIStateChannel()
+        
+        # Live captions, laid out incrementally and kept on a panel that scrolls
+        self.transcript = Transcript(lambda text: self.font_small.size(text)[0], 0, TRANSCRIPT_HISTORY)
+        self.caption_panel = None
+        self.caption_start = 0  # first transcript line of this conversation
+        self.caption_rows = []  # what each panel row currently shows
+        
+        # Everything is drawn at the internal resolution and upscaled to the display
+        self.auto_scale = render_scale == "auto"
+        self.render_scale = None
+        self.frame_costs = []
+        self.cheap_windows = 0
+        self.set_render_scale(1.0 if self.auto_scale else float(render_scale))
+    
+    def px(self, size):
+        """Convert a layout size in display pixels to internal pixels"""
+        return max(1, int(round(size * self.render_scale)))
+    
+    def set_render_scale(self, scale):
+        """Render at `scale` times the display resolution, re-deriving the layout from the internal size"""
+        scale = min(1.0, max(0.1, scale))
+        if scale == self.render_scale:
+            return
+        old_width = getattr(self, "width", None)
+        self.render_scale = scale
+        self.width = max(1, int(self.display_width * scale))
+        self.height = max(1, int(self.display_height * scale))
+        self.center_x = self.width // 2
+        self.center_y = self.height // 2
+        
+        if scale == 1.0:
+            self.screen = self.display
+        else:
+            self.screen = pygame.Surface((self.width, self.height)).convert(self.display)
+        
+        # Sizes below are in display pixels, so the picture looks the same at any scale
+        self.grid_spacing = self.px(50)
+        self.visualizer.set_layout(self.center_x - self.px(200), self.center_y + self.px(150),
+                                   self.px(400), self.px(100))
+        self.font_large = pygame.font.Font(None, self.px(72))
+        self.font_medium = pygame.font.Font(None, self.px(48))
+        self.font_small = pygame.font.Font(None, self.px(32))
+        
+        # Re-wrap the captions for the new font, keeping roughly the lines that were showing
+        shown = self.transcript.finished - self.caption_start
+        self.transcript.relayout(lambda text: self.font_small.size(text)[0], min(self.width - self.px(120), self.px(1200)))
+        self.caption_start = self.transcript.finished - min(shown, len(self.transcript.lines))
+        self.caption_panel = None
+        
+        self.grid_cache.clear()
+        self.orb_sprites.clear()
+        self._prewarm_orb_sprites()
+        self.text_cache.clear()
+        self.dirty_rects = []
+        if old_width:
+            self.particles.rescale(self.width / old_width)
+    
+    def _adapt_render_scale(self, cost):
+        """Step the internal resolution down when frames blow the budget, back up when there's headroom"""
+        self.frame_costs.append(cost)
+        if len(self.frame_costs) < UI_FPS:
+            return
+        average = sum(self.frame_costs) / len(self.frame_costs)
+        self.frame_costs = []
+        budget = 1 / UI_FPS
+        
+        scales = [s for s in self.AUTO_SCALES if s >= UI_RENDER_SCALE_MIN] or [1.0]
+        index = scales.index(self.render_scale) if self.render_scale in scales else 0
+        if average > budget * 0.8 and index + 1 < len(scales):
+            self.set_render_scale(scales[index + 1])
+            print(f"Render scale {self.render_scale} ({average * 1000:.1f}ms per frame)")
+        elif average < budget * 0.3 and index > 0:
+            # Only step up after a few cheap seconds, one busy moment shouldn't flip-flop
+            self.cheap_windows += 1
+            if self.cheap_windows >= 3:
+                self.cheap_windows = 0
+                self.set_render_scale(scales[index - 1])
+                print(f"Render scale {self.render_scale} ({average * 1000:.1f}ms per frame)")
+        else:
+            self.cheap_windows = 0
+        
     def set_state(self, new_state: UIState):
+        """Request a UI state change, safe to call from any thread"""
+        self.channel.publish_state(new_state)
+    
+    def _apply_state(self, new_state: UIState):
         """Change UI state and trigger visual effects"""
         if self.state != new_state:
             self.state = new_state
+            self.mark_active()
             self._trigger_state_effects()
             if new_state in self.state_callbacks:
                 self.state_callbacks[new_state]()
@@ -125,6 +435,10 @@ class GameUI:
     def _trigger_state_effects(self):
         """Trigger visual effects based on state change"""
         if self.state == UIState.WAKE_DETECTED:
+            # New conversation, start the captions on a clean panel
+            self.transcript.end_turn()
+            self.caption_start = self.transcript.finished
+            self.caption_panel = None
             self._create_wake_particles()
             self.orb_color = Colors.GREEN
         elif self.state == UIState.PROCESSING:
@@ -138,82 +452,155 @@ class GameUI:
     
     def _create_wake_particles(self):
         """Create particle burst when wake word detected"""
-        for _ in range(50):
-            angle = np.random.uniform(0, 2 * np.pi)
-            speed = np.random.uniform(50, 200)
-            vx = math.cos(angle) * speed
-            vy = math.sin(angle) * speed
-            color = Colors.GREEN
-            lifetime = np.random.uniform(1.0, 2.0)
-            particle = Particle(self.center_x, self.center_y, vx, vy, color, lifetime)
-            self.particles.append(particle)
-    
-    def update_audio_data(self, audio_data):
-        """Update waveform visualization with new audio data"""
+        speed = (50 * self.render_scale, 200 * self.render_scale)
+        self.particles.emit(self.center_x, self.center_y, 50, Colors.GREEN, speed=speed)
+    
+    def update_audio_data(self, audio_data, sample_rate=RECORDING_SAMPLE_RATE):
+        """Queue audio for visualization, cheap enough to call from the audio path"""
         if len(audio_data) > 0:
-            # Downsample audio data for visualization
-            if len(audio_data) > 128:
-                step = len(audio_data) // 128
-                self.wave_data = audio_data[::step][:128]
+            self.visualizer.feed(audio_data, sample_rate)
+    
+    def follow_playback(self, envelope):
+        """Visualize the reply from the player's PlaybackEnvelope as it is heard, None to stop"""
+        self.visualizer.follow(envelope)
+    
+    def add_transcript(self, delta):
+        """Queue a caption delta, safe to call from any thread"""
+        if CAPTIONS_ENABLED:
+            self.channel.publish_transcript(delta)
+    
+    def end_transcript_turn(self):
+        """Finish the current caption line, safe to call from any thread"""
+        if CAPTIONS_ENABLED:
+            self.channel.publish_transcript(None)
+    
+    def consume_updates(self):
+        """Apply state changes and visualization computed since the last frame"""
+        for state in self.channel.consume():
+            self._apply_state(state)
+        
+        deltas = self.channel.consume_transcript()
+        for delta in deltas:
+            if delta is None:
+                self.transcript.end_turn()
             else:
-                self.wave_data = np.pad(audio_data, (0, 128 - len(audio_data)), 'constant')
-            
-            # Calculate pulse intensity from audio volume
-            self.pulse_intensity = min(1.0, np.mean(np.abs(self.wave_data)) * 10)
+                self.transcript.append(delta)
+        if deltas:
+            self.mark_active()
+        
+        sequence, points, pulse, closed = self.visualizer.latest()
+        if sequence != self.vis_sequence:
+            self.vis_sequence = sequence
+            self.vis_points = points
+            self.vis_closed = closed
+            self.pulse_intensity = pulse
+            self.mark_active()
+    
+    def _grid_surface(self):
+        """Get the pre-rendered grid, one spacing larger than the screen so it can scroll"""
+        key = (self.width, self.height)
+        surface = self.grid_cache.get(key)
+        if surface is None:
+            spacing = self.grid_spacing
+            surface = pygame.Surface((self.width + spacing, self.height + spacing)).convert()
+            surface.fill(self.bg_color)
+            for x in range(0, surface.get_width(), spacing):
+                pygame.draw.line(surface, Colors.DARK_BLUE, (x, 0), (x, surface.get_height()), 1)
+            for y in range(0, surface.get_height(), spacing):
+                pygame.draw.line(surface, Colors.DARK_BLUE, (0, y), (surface.get_width(), y), 1)
+            self.grid_cache[key] = surface
+        return surface
     
     def draw_background(self):
         """Draw animated background"""
-        self.screen.fill(self.bg_color)
-        
-        # Draw moving grid lines
-        grid_spacing = 50
-        offset = (self.time * 20) % grid_spacing
+        # The grid is static apart from its offset, so one blit replaces fill + line calls
+        offset = self._grid_offset()
+        self.screen.blit(self._grid_surface(), (offset, offset))
+    
+    def _grid_offset(self):
+        return int((self.grid_time * 20 * self.render_scale) % self.grid_spacing) - self.grid_spacing
+    
+    def restore_background(self, rect):
+        """Redraw just the background under `rect`"""
+        offset = self._grid_offset()
+        self.screen.blit(self._grid_surface(), rect, area=rect.move(-offset, -offset))
+    
+    def _build_orb_sprite(self, color, radius):
+        """Ring with translucent outer glow rings and a soft halo"""
+        scale = self.render_scale
         
-        for x in range(-grid_spacing, self.width + grid_spacing, grid_spacing):
-            x_pos = x + offset
-            color = (*Colors.DARK_BLUE, 30)
-            pygame.draw.line(self.screen, Colors.DARK_BLUE, (x_pos, 0), (x_pos, self.height), 1)
+        def alpha(distance):
+            # Shape is defined in display pixels, sampled at the internal resolution
+            distance = distance / scale
+            radius_px = radius / scale
+            outside = np.maximum(distance - radius_px, 0)
+            halo = 70 * np.exp(-outside / 8) * (distance >= radius_px - 4)
+            ring = 255 * np.clip(2.0 - np.abs(distance - radius_px), 0, 1)
+            glow_rings = np.zeros_like(distance)
+            for i in range(1, 5):
+                glow_rings = np.maximum(glow_rings, (50 - i * 10) * 2 * np.clip(1.5 - np.abs(distance - radius_px - i * 10), 0, 1))
+            return np.maximum(np.maximum(ring, glow_rings), halo)
+        # Cropped just past the outermost glow ring, where the halo has faded out
+        return glow_sprite(color, radius + self.px(42), alpha)
+    
+    def _build_core_sprite(self, radius):
+        """Anti-aliased filled white disc"""
+        return radial_sprite(Colors.WHITE, radius + 2, lambda d: 255 * np.clip(radius + 0.5 - d, 0, 1))
+    
+    def _orb_keys(self):
+        """Every (key, build) draw_central_orb can ask for at the current render scale"""
+        scale, step = self.render_scale, self.orb_radius_step
+        keys = []
+        for color in (Colors.GREEN, Colors.ORANGE, Colors.PURPLE, Colors.CYAN, Colors.BLUE):
+            for radius in range(int(round(80 * scale / step) * step), int(round(110 * scale / step) * step) + 1, step):
+                keys.append(((color, radius), lambda color=color, radius=radius: self._build_orb_sprite(color, radius)))
+        # Core is 0.3 of the 80..110 pulse radius, breathing by 5 either way
+        for radius in range(max(1, int(19 * scale)), int(38 * scale) + 1):
+            keys.append((("core", radius), lambda radius=radius: self._build_core_sprite(radius)))
+        return keys
+    
+    def _prewarm_orb_sprites(self):
+        """Build every orb sprite for this render scale in the background, so a pulse never builds one mid-frame"""
+        keys = self._orb_keys()
+        self.orb_sprites.max_size = len(keys)
+        scale = self.render_scale
         
-        for y in range(-grid_spacing, self.height + grid_spacing, grid_spacing):
-            y_pos = y + offset
-            pygame.draw.line(self.screen, Colors.DARK_BLUE, (0, y_pos), (self.width, y_pos), 1)
+        def build():
+            sprites = [(key, make()) for key, make in keys]
+            if scale == self.render_scale:
+                self.orb_prewarmed = (scale, sprites)
+        threading.Thread(target=build, daemon=True).start()
     
     def draw_central_orb(self):
         """Draw the main AI assistant orb"""
-        base_radius = 80
-        pulse_radius = base_radius + (self.pulse_intensity * 30)
+        if self.orb_prewarmed is not None:
+            scale, sprites = self.orb_prewarmed
+            self.orb_prewarmed = None
+            if scale == self.render_scale:
+                for key, sprite in sprites:
+                    self.orb_sprites.put(key, sprite)
         
-        # Outer glow effect
-        for i in range(5):
-            glow_radius = int(pulse_radius + i * 10)
-            alpha = max(0, 50 - i * 10)
-            glow_color = (*self.orb_color, alpha)
-            # Note: pygame doesn't support alpha directly, so we'll use a simpler approach
-            pygame.draw.circle(self.screen, self.orb_color, (self.center_x, self.center_y), glow_radius, 2)
+        base_radius = 80 * self.render_scale
+        pulse_radius = base_radius + (self.pulse_intensity * 30 * self.render_scale)
+        step = self.orb_radius_step
+        radius = int(round(pulse_radius / step) * step)
         
-        # Main orb
-        pygame.draw.circle(self.screen, self.orb_color, (self.center_x, self.center_y), int(pulse_radius), 3)
+        # Glow, rings and main orb come from one cached sprite, added onto the background so the grid shows through
+        color = self.orb_color
+        orb = self.orb_sprites.get((color, radius), lambda: self._build_orb_sprite(color, radius))
+        rect = self.screen.blit(orb, orb.get_rect(center=(self.center_x, self.center_y)), special_flags=pygame.BLEND_RGB_ADD)
         
         # Inner core with breathing effect
-        core_radius = int(pulse_radius * 0.3 + math.sin(self.time * 3) * 5)
-        pygame.draw.circle(self.screen, Colors.WHITE, (self.center_x, self.center_y), core_radius)
+        core_radius = max(1, int(pulse_radius * 0.3 + math.sin(self.time * 3) * 5 * self.render_scale))
+        core = self.orb_sprites.get(("core", core_radius), lambda: self._build_core_sprite(core_radius))
+        self.screen.blit(core, core.get_rect(center=(self.center_x, self.center_y)))
+        return rect
     
     def draw_waveform(self):
-        """Draw audio waveform visualization"""
-        if self.state in [UIState.PROCESSING, UIState.SPEAKING]:
-            wave_width = 400
-            wave_height = 100
-            wave_x = self.center_x - wave_width // 2
-            wave_y = self.center_y + 150
-            
-            points = []
-            for i, amplitude in enumerate(self.wave_data):
-                x = wave_x + (i / len(self.wave_data)) * wave_width
-                y = wave_y + amplitude * wave_height * 0.5
-                points.append((x, y))
-            
-            if len(points) > 1:
-                pygame.draw.lines(self.screen, self.wave_color, False, points, 2)
+        """Draw audio waveform or spectrum visualization"""
+        if self.state in [UIState.PROCESSING, UIState.SPEAKING] and len(self.vis_points) > 1:
+            # Points were computed off the render thread, this is a single draw call
+            pygame.draw.aalines(self.screen, self.wave_color, self.vis_closed, self.vis_points)
     
     def draw_status_text(self):
         """Draw current status and information"""
@@ -228,22 +615,72 @@ class GameUI:
         text = status_text.get(self.state, "Unknown")
         color = self.orb_color
         
-        rendered = self.font_medium.render(text, True, color)
-        text_rect = rendered.get_rect(center=(self.center_x, self.center_y + 250))
-        self.screen.blit(rendered, text_rect)
+        rendered = self.text_cache.render(text, self.font_medium, color)
+        text_rect = rendered.get_rect(center=(self.center_x, self.center_y + self.px(250)))
+        status_rect = self.screen.blit(rendered, text_rect)
         
         # Draw time
         current_time = datetime.now().strftime("%H:%M:%S")
-        time_text = self.font_small.render(current_time, True, Colors.GRAY)
-        self.screen.blit(time_text, (20, 20))
+        time_text = self.text_cache.render(current_time, self.font_small, Colors.GRAY)
+        time_rect = self.screen.blit(time_text, (self.px(20), self.px(20)))
+        return [status_rect, time_rect]
+    
+    def _caption_rows(self):
+        """Text of each caption row: the newest finished lines, then the line being written"""
+        finished = self.transcript.lines_since(self.caption_start)[-(CAPTION_LINES - 1):]
+        rows = [""] * (CAPTION_LINES - 1 - len(finished)) + finished + [self.transcript.current.strip()]
+        return rows
+    
+    def _draw_caption_row(self, index, text, cache=True):
+        line_height = self.font_small.get_linesize()
+        row = pygame.Rect(0, index * line_height, self.caption_panel.get_width(), line_height)
+        self.caption_panel.fill((0, 0, 0, 0), row)
+        if text:
+            if cache:
+                rendered = self.text_cache.render(text, self.font_small, Colors.WHITE)
+            else:
+                # The line being written changes with every delta, don't flood the cache with it
+                rendered = self.font_small.render(text, True, Colors.WHITE)
+            self.caption_panel.blit(rendered, rendered.get_rect(midtop=row.midtop))
+    
+    def _update_caption_panel(self):
+        """Bring the panel up to date, touching only the rows that changed"""
+        rows = self._caption_rows()
+        if self.caption_panel is None:
+            size = (self.transcript.width, self.font_small.get_linesize() * CAPTION_LINES)
+            self.caption_panel = pygame.Surface(size, pygame.SRCALPHA)
+            self.caption_rows = [None] * CAPTION_LINES
+        if rows == self.caption_rows:
+            return
+        
+        # A finished line moves everything up a row, which one scroll does
+        finished = rows[:-1]
+        old = self.caption_rows[:-1]
+        shift = next((n for n in range(1, len(old)) if old[n:] == finished[:len(old) - n]), None)
+        if shift and any(old[shift:]):
+            self.caption_panel.scroll(0, -shift * self.font_small.get_linesize())
+            self.caption_rows = self.caption_rows[shift:] + [None] * shift
+        
+        for index, text in enumerate(rows):
+            if self.caption_rows[index] != text:
+                self._draw_caption_row(index, text, cache=index < CAPTION_LINES - 1)
+        self.caption_rows = rows
+    
+    def draw_transcript(self):
+        """Draw live captions below the status text"""
+        if self.state not in (UIState.PROCESSING, UIState.SPEAKING):
+            return None
+        if self.transcript.finished == self.caption_start and not self.transcript.current.strip():
+            return None
+        self._update_caption_panel()
+        top = min(self.center_y + self.px(290), self.height - self.caption_panel.get_height() - self.px(10))
+        position = self.caption_panel.get_rect(midtop=(self.center_x, top))
+        return self.screen.blit(self.caption_panel, position)
     
     def draw_particles(self, dt):
         """Update and draw particle effects"""
-        # Update particles
-        self.particles = [p for p in self.particles if p.lifetime > 0]
-        for particle in self.particles:
-            particle.update(dt)
-            particle.draw(self.screen)
+        self.particles.update(dt)
+        self.particles.draw(self.screen)
     
     def update(self, dt):
         """Update all UI elements"""
@@ -259,26 +696,102 @@ class GameUI:
                 elif event.key == pygame.K_SPACE:
                     # Simulate wake word for testing
                     self.set_state(UIState.WAKE_DETECTED)
+                elif event.key == pygame.K_v:
+                    self.visualizer.toggle_mode()
     
-    def draw(self):
-        """Main drawing function"""
-        dt = self.clock.tick(60) / 1000.0
+    def mark_active(self):
+        """Keep rendering at full frame rate for a while, e.g. on state change or audio"""
+        self.last_activity = time.time()
+    
+    def is_idle(self):
+        """True when only the clock and the breathing core are changing"""
+        return (self.state in self.IDLE_STATES
+                and len(self.particles) == 0
+                and time.time() - self.last_activity > UI_ACTIVE_HOLD)
+    
+    def target_fps(self):
+        """Frame rate to tick at, dropping to UI_IDLE_FPS while idle in dirty mode"""
+        if self.render_mode == "dirty" and self.is_idle():
+            return UI_IDLE_FPS
+        return UI_FPS
+    
+    def present(self, rects=None):
+        """Show the frame, upscaling the internal surface (or just `rects` of it) to the display"""
+        if self.screen is self.display:
+            if rects is None:
+                pygame.display.flip()
+            else:
+                pygame.display.update(rects)
+            return
         
-        self.update(dt)
+        scale = pygame.transform.smoothscale if UI_SMOOTH_SCALE else pygame.transform.scale
+        if rects is None:
+            scale(self.screen, self.display.get_size(), self.display)
+            pygame.display.flip()
+            return
+        
+        updated = []
+        for rect in rects:
+            rect = rect.clip(self.screen.get_rect())
+            if rect.w == 0 or rect.h == 0:
+                continue
+            left = int(rect.left / self.render_scale)
+            top = int(rect.top / self.render_scale)
+            target = pygame.Rect(left, top,
+                                 math.ceil(rect.right / self.render_scale) - left,
+                                 math.ceil(rect.bottom / self.render_scale) - top)
+            scale(self.screen.subsurface(rect), target.size, self.display.subsurface(target))
+            updated.append(target)
+        pygame.display.update(updated)
+    
+    def render(self, dt):
+        """Draw one frame and present it"""
+        frame_started = time.perf_counter()
+        self.consume_updates()
+        quiet = self.render_mode == "dirty" and self.is_idle()
         
+        if quiet and self.dirty_rects:
+            # Only the orb and the text change: restore what they covered and redraw them
+            for rect in self.dirty_rects:
+                self.restore_background(rect)
+            rects = [self.draw_central_orb()] + self.draw_status_text()
+            self.present(self.dirty_rects + rects)
+            self.dirty_rects = rects
+            frame_time.observe(time.perf_counter() - frame_started)
+            return
+        
+        if not quiet:
+            self.grid_time += dt
+        started = time.perf_counter()
         self.draw_background()
-        self.draw_central_orb()
+        orb_rect = self.draw_central_orb()
         self.draw_waveform()
+        self.draw_transcript()
         self.draw_particles(dt)
-        self.draw_status_text()
+        text_rects = self.draw_status_text()
+        if self.auto_scale:
+            # Drawing cost only, present() may wait for vsync
+            self._adapt_render_scale(time.perf_counter() - started)
+        self.present()
+        
+        # The first quiet frame is a full one, after that only these regions change
+        self.dirty_rects = [orb_rect] + text_rects if quiet else []
+        frame_time.observe(time.perf_counter() - frame_started)
+    
+    def draw(self):
+        """Main drawing function"""
+        self.consume_updates()  # before picking the frame rate, render() takes what arrives meanwhile
+        dt = self.clock.tick(self.target_fps()) / 1000.0
         
-        pygame.display.flip()
+        self.update(dt)
+        self.render(dt)
     
     def run(self):
         """Main UI loop"""
         while self.running:
             self.draw()
         
+        self.visualizer.stop()
         pygame.quit()
     
     def register_state_callback(self, state: UIState, callback):
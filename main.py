@@ -1,43 +1,46 @@
 import threading
-from wake_word import wakeup_detect, BackgroundWakeWordDetector
+from openai import AsyncOpenAI
+from wake_word import wakeup_detect
 from realtime_client import RealtimeClient
+from session_runtime import SessionRuntime, session_setup_stats
+from audio_utils import earcons
+import metrics
+from watchdog import watchdog
+from config import OPENAI_API_KEY, METRICS_PORT, METRICS_HOST, WATCHDOG_ENABLED
 
 
 # Global interrupt event
 interrupt_event = threading.Event()
 
 
-def on_wakeword():
-    """Handle wake word detection by starting the AI assistant."""
-    # Clear any existing interrupt
-    interrupt_event.clear()
-    # Start the background wake word detection
-    detector = BackgroundWakeWordDetector(interrupt_event)
-    detector.start()
-    
-    # Start the AI assistant in a separate thread so wake word detection can continue
-    def run_assistant():
-        import asyncio
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            app = RealtimeClient(interrupt_event)
-            app.run(headless=True)
-        finally:
-            # Cleanup after conversation ends
-            detector.stop()
-            loop.close()
-    
-    assistant_thread = threading.Thread(target=run_assistant, daemon=True)
-    assistant_thread.start()
-
-
 def main():
     """Main application entry point."""
     print("SkyAI Voice Assistant starting...")
     print("Listening for wake word 'Jarvis'...")
-    wakeup_detect(on_wakeword, interrupt_event)
+    earcons.start()
+    if METRICS_PORT:
+        metrics.serve(METRICS_PORT, METRICS_HOST)
+
+    # One client and one event loop for every conversation, the wake word starts or interrupts them
+    client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+
+    async def converse():
+        await RealtimeClient(interrupt_event, client).start()
+
+    runtime = SessionRuntime(converse, interrupt_event)
+    runtime.start()
+    if WATCHDOG_ENABLED:
+        # No UI to restart headless, a session restart that doesn't help goes to re-exec
+        watchdog.on("session", runtime.restart)
+        watchdog.start()
+    try:
+        wakeup_detect(runtime.wake, interrupt_event)
+    finally:
+        watchdog.stop()
+        runtime.stop()
+        earcons.stop()
+        print(session_setup_stats.report())
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,77 +1,112 @@
-import asyncio
+import importlib
 import threading
-import pygame
 import sys
-from wake_word import wakeup_detect, BackgroundWakeWordDetector
-from ui_realtime_client import UIRealtimeClient
-from game_ui import GameUI, UIState
-from audio_utils import ack_beep
+from perf_stats import LatencyStats, startup_profile
+from session_policy import conversation_stats
+from session_runtime import SessionRuntime, session_setup_stats
+
+# Only the UI and the wake engine load before "Listening"; the session stack
+# (openai, soxr, sounddevice) is imported in the background afterwards
+with startup_profile.step("import pygame"):
+    import pygame
+with startup_profile.step("import wake_word"):
+    from wake_word import wakeup_detect, frame_lag_stats, detect_latency_stats
+with startup_profile.step("import game_ui"):
+    from game_ui import GameUI, UIState
+from audio_utils import earcons
+import metrics
+from watchdog import watchdog
+from config import WAKE_IN_PROCESS, METRICS_PORT, METRICS_HOST, WATCHDOG_ENABLED
+
+# openai.resources.beta.beta is what the SDK imports lazily on the first client.beta access
+SESSION_MODULES = ("sounddevice", "soxr", "openai", "openai.resources.beta.beta", "tools", "ui_realtime_client")
 
 
 class SkyAIApp:
-    def __init__(self, fullscreen=True):
-        # Initialize UI
-        if fullscreen:
-            # Get display info for fullscreen
-            pygame.init()
-            info = pygame.display.Info()
-            self.ui = GameUI(info.current_w, info.current_h, fullscreen=True)
-        else:
-            self.ui = GameUI(1280, 720, fullscreen=False)
+    def __init__(self, fullscreen=True, wake_in_process=WAKE_IN_PROCESS, profile_startup=False):
+        # Initialize UI, GameUI picks up the display size itself when fullscreen
+        self.fullscreen = fullscreen
+        with startup_profile.step("GameUI init"):
+            self.ui = self.create_ui()
         
         # Global interrupt event
         self.interrupt_event = threading.Event()
         
         # Initialize components
         self.realtime_client = None
-        self.wake_detector = None
+        self.openai_client = None
+        self.runtime = SessionRuntime(self.start_ai_assistant, self.interrupt_event)
+        self.wake_in_process = wake_in_process
+        self.wake_process = None
+        self.frame_stats = LatencyStats("UI frame time")
+        self.profile_startup = profile_startup
         
         # Set initial state
         self.ui.set_state(UIState.LISTENING)
         
+    def create_ui(self):
+        if self.fullscreen:
+            return GameUI(fullscreen=True)
+        return GameUI(1280, 720, fullscreen=False)
+    
     def on_wakeword(self):
         """Handle wake word detection by starting the AI assistant."""
-        print("Wake word detected! Starting AI assistant...")
+        if self.runtime.active:
+            # The wake engine keeps listening during conversations, the wake word starts over.
+            # That is the only listener, in a thread or with --wake-process, never one per conversation
+            print("Wake word detected! Restarting AI assistant...")
+        else:
+            print("Wake word detected! Starting AI assistant...")
         
         # Update UI state
         self.ui.set_state(UIState.WAKE_DETECTED)
         
-        # Play acknowledgment beep
-        ack_beep()
-        
-        # Clear any existing interrupt
-        self.interrupt_event.clear()
+        # Acknowledgment cue, returns immediately
+        earcons.play("wake")
         
-        # Start the background wake word detection for interrupts
-        if self.wake_detector:
-            self.wake_detector.stop()
-        self.wake_detector = BackgroundWakeWordDetector(self.interrupt_event)
-        self.wake_detector.start()
-        
-        # Start the AI assistant in a separate thread
-        def run_ai():
-            asyncio.run(self.start_ai_assistant())
-        
-        ai_thread = threading.Thread(target=run_ai, daemon=True)
-        ai_thread.start()
+        # Runs on the session runtime's loop, no thread or loop per wake
+        self.runtime.wake()
+    
+    def warm_session_stack(self):
+        """Import the session modules once the wake engine is listening, so they're ready on wake"""
+        startup_profile.listening.wait(timeout=30)
+        for name in SESSION_MODULES:
+            with startup_profile.step(f"import {name}"):
+                importlib.import_module(name)
+        earcons.start()
+        startup_profile.mark("session stack ready")
+        if self.profile_startup:
+            print(startup_profile.report())
     
     async def start_ai_assistant(self):
         """Start the AI assistant with UI integration"""
-        self.realtime_client = UIRealtimeClient(self.interrupt_event, self.ui)
+        # Usually already imported by warm_session_stack, otherwise this waits for it
+        from ui_realtime_client import UIRealtimeClient
+        if self.openai_client is None:
+            # Created once, on the runtime loop it is used from
+            from openai import AsyncOpenAI
+            from config import OPENAI_API_KEY
+            self.openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+        self.realtime_client = UIRealtimeClient(self.interrupt_event, self.ui, self.openai_client)
         
         try:
             await self.realtime_client.start()
         except Exception as e:
             print(f"Error in AI assistant: {e}")
         finally:
-            # Cleanup
-            if self.wake_detector:
-                self.wake_detector.stop()
+            self.realtime_client = None
             self.ui.set_state(UIState.LISTENING)
             print("AI assistant session ended")
     
     def run_wake_detection(self):
-        """Run wake word detection in a separate thread"""
+        """Run wake word detection in a separate thread or process"""
+        if self.wake_in_process:
+            print("SkyAI Voice Assistant starting (wake word in separate process)...")
+            from wake_process import WakeWordProcess
+            self.wake_process = WakeWordProcess(self.on_wakeword, self.interrupt_event)
+            self.wake_process.start()
+            return None
+
         def wake_thread():
             print("SkyAI Voice Assistant starting...")
             print("Listening for wake word 'Jarvis'...")
@@ -83,11 +118,19 @@ class SkyAIApp:
     
     def run(self):
         """Main application loop"""
-        # Start wake word detection
+        # Start wake word detection, then load the rest in the background
+        self.runtime.start()
+        if METRICS_PORT:
+            metrics.serve(METRICS_PORT, METRICS_HOST)
+        if WATCHDOG_ENABLED:
+            watchdog.on("session", self.runtime.restart)
+            watchdog.start()
         wake_thread = self.run_wake_detection()
+        threading.Thread(target=self.warm_session_stack, name="session-warmup", daemon=True).start()
         
         # Handle UI events and rendering
         clock = pygame.time.Clock()
+        first_frame = True
         
         try:
             while self.ui.running:
@@ -103,26 +146,39 @@ class SkyAIApp:
                             self.on_wakeword()
                         elif event.key == pygame.K_q:
                             self.ui.running = False
+                        elif event.key == pygame.K_v:
+                            self.ui.visualizer.toggle_mode()
                 
-                # Update and draw UI
-                dt = clock.tick(60) / 1000.0
+                # Update and draw UI, ticking slower while nothing is happening. Apply what
+                # arrived since the last frame first, so audio or a state change picks the rate
+                self.ui.consume_updates()
+                dt = clock.tick(self.ui.target_fps()) / 1000.0
+                watchdog.beat("render loop")
+                metrics.render_interval.observe(dt)
+                self.frame_stats.add(dt)
                 self.ui.update(dt)
-                self.ui.draw_background()
-                self.ui.draw_central_orb()
-                self.ui.draw_waveform()
-                self.ui.draw_particles(dt)
-                self.ui.draw_status_text()
-                
-                pygame.display.flip()
+                self.ui.render(dt)
+                if first_frame:
+                    startup_profile.mark("first frame")
+                    first_frame = False
                 
         except KeyboardInterrupt:
             print("\nShutting down SkyAI...")
         finally:
-            # Cleanup
-            if self.realtime_client:
-                self.interrupt_event.set()
-            if self.wake_detector:
-                self.wake_detector.stop()
+            # Cleanup, which may take a while without being a stall
+            watchdog.stop()
+            self.runtime.stop()
+            if self.wake_process:
+                self.wake_process.stop()
+            self.ui.visualizer.stop()
+            earcons.stop()
+            for stats in (self.frame_stats, frame_lag_stats, detect_latency_stats, conversation_stats,
+                          session_setup_stats):
+                print(stats.report())
+            if "tools" in sys.modules:
+                print(sys.modules["tools"].tool_latency_stats.report())
+            if "connection_manager" in sys.modules:
+                print(sys.modules["connection_manager"].connection_stats.report())
             pygame.quit()
             sys.exit()
 
@@ -130,11 +186,11 @@ class SkyAIApp:
 def main():
     """Main application entry point"""
     # Check for command line arguments
-    fullscreen = True
-    if len(sys.argv) > 1 and sys.argv[1] == "--windowed":
-        fullscreen = False
+    fullscreen = "--windowed" not in sys.argv[1:]
+    wake_in_process = WAKE_IN_PROCESS or "--wake-process" in sys.argv[1:]
+    profile_startup = "--startup-profile" in sys.argv[1:]
     
-    app = SkyAIApp(fullscreen=fullscreen)
+    app = SkyAIApp(fullscreen=fullscreen, wake_in_process=wake_in_process, profile_startup=profile_startup)
     app.run()
 
 
@@ -0,0 +1,189 @@
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class ThreadCells:
+    """Per-thread accumulators, so hot paths update metrics without a lock.
+
+    Threads started through `threading` each write their own list, kept in a
+    table keyed by thread ident. Whenever a thread gets its list, the lists
+    of threads that have exited are folded into a base total, so the table
+    only holds live threads and at most MAX_THREADS of them, scraped or not.
+    Foreign threads (PortAudio callbacks show up as a _DummyThread, which
+    never reports having exited) and threads past the limit share one list
+    behind a lock instead.
+    """
+    MAX_THREADS = 64
+
+    def __init__(self, size):
+        self.size = size
+        self.local = threading.local()
+        self.cells = {}  # thread ident -> (thread, cell)
+        self.base = [0] * size  # exited threads
+        self.shared = [0] * size
+        self.lock = threading.Lock()  # new threads, shared writers and scrapes, never the per-thread path
+
+    def add(self, *updates):
+        """Add each (index, amount) to this thread's accumulators"""
+        try:
+            cell = self.local.cell
+        except AttributeError:
+            cell = self.local.cell = self._register()
+        if cell is None:
+            with self.lock:
+                for index, amount in updates:
+                    self.shared[index] += amount
+        else:
+            for index, amount in updates:
+                cell[index] += amount
+
+    def _register(self):
+        """A list of this thread's own, or None to use the shared one"""
+        thread = threading.current_thread()
+        with self.lock:
+            self._fold_exited()
+            if isinstance(thread, threading._DummyThread) or len(self.cells) >= self.MAX_THREADS:
+                return None
+            cell = [0] * self.size
+            self.cells[thread.ident] = (thread, cell)
+            return cell
+
+    def _fold_exited(self):
+        for ident, (thread, cell) in list(self.cells.items()):
+            if not thread.is_alive():
+                # Nobody writes this cell anymore, and its ident may be handed to a new thread
+                for i, value in enumerate(cell):
+                    self.base[i] += value
+                del self.cells[ident]
+
+    def totals(self):
+        with self.lock:
+            self._fold_exited()
+            totals = [base + shared for base, shared in zip(self.base, self.shared)]
+            for _thread, cell in self.cells.values():
+                for i, value in enumerate(list(cell)):
+                    totals[i] += value
+            return totals
+
+
+class Counter:
+    def __init__(self, name, help, label=None):
+        self.name = name
+        self.help = help
+        self.label = label  # optional label name, children are created by labels(value)
+        self.children = {}
+        self.cells = ThreadCells(1)
+
+    def inc(self, amount=1):
+        self.cells.add((0, amount))
+
+    def labels(self, value):
+        child = self.children.get(value)
+        if child is None:
+            child = self.children.setdefault(value, Counter(self.name, self.help))
+        return child
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        if self.label:
+            for value, child in list(self.children.items()):
+                lines.append(f'{self.name}{{{self.label}="{value}"}} {child.cells.totals()[0]}')
+        else:
+            lines.append(f"{self.name} {self.cells.totals()[0]}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help, buckets):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        # One count per bucket plus +Inf, then the sum
+        self.cells = ThreadCells(len(self.buckets) + 2)
+
+    def observe(self, value):
+        self.cells.add((bisect.bisect_left(self.buckets, value), 1), (-1, value))
+
+    def expose(self):
+        totals = self.cells.totals()
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        cumulative = 0
+        for bound, count in zip(self.buckets + ("+Inf",), totals[:-1]):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f"{self.name}_sum {totals[-1]}")
+        lines.append(f"{self.name}_count {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def expose(self):
+        """Everything in the Prometheus text format"""
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.expose())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0)
+
+wake_detections = registry.add(Counter("skyai_wake_detections_total", "Wake words detected"))
+sessions = registry.add(Counter("skyai_sessions_total", "Conversations by how they ended", label="reason"))
+session_duration = registry.add(Histogram(
+    "skyai_session_duration_seconds", "Conversation length", (5, 10, 20, 30, 60, 120, 300, 600)))
+time_to_first_audio = registry.add(Histogram(
+    "skyai_time_to_first_audio_seconds", "End of the user's turn to the first reply audio", LATENCY_BUCKETS))
+uplink_bytes = registry.add(Counter("skyai_uplink_audio_bytes_total", "Mic audio sent to the API"))
+downlink_bytes = registry.add(Counter("skyai_downlink_audio_bytes_total", "Reply audio received from the API"))
+player_underruns = registry.add(Counter(
+    "skyai_player_underruns_total", "Playback callbacks that reported an output underflow"))
+player_starved = registry.add(Counter(
+    "skyai_player_starved_blocks_total", "Playback blocks padded with silence because the queue ran dry"))
+frame_time = registry.add(Histogram(
+    "skyai_render_frame_seconds", "GameUI.render time per frame",
+    (0.002, 0.004, 0.008, 0.012, 0.016, 0.025, 0.033, 0.05, 0.1)))
+loop_lag = registry.add(Histogram(
+    "skyai_event_loop_lag_seconds", "How late the session event loop runs a scheduled callback",
+    (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)))
+render_interval = registry.add(Histogram(
+    "skyai_render_loop_interval_seconds", "Time between two iterations of the UI render loop",
+    (0.008, 0.017, 0.025, 0.033, 0.05, 0.1, 0.15, 0.25, 0.5, 1.0, 2.0)))
+watchdog_stalls = registry.add(Counter(
+    "skyai_watchdog_stalls_total", "Loops that stopped checking in with the watchdog", label="loop"))
+watchdog_recoveries = registry.add(Counter(
+    "skyai_watchdog_recoveries_total", "Recovery steps the watchdog took", label="step"))
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = registry.expose().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # scraped every few seconds, don't fill the console
+
+
+def serve(port, host="127.0.0.1"):
+    """Serve /metrics from a daemon thread, returns the server"""
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    print(f"Metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
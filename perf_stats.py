@@ -0,0 +1,84 @@
+import threading
+import time
+from contextlib import contextmanager
+import numpy as np
+
+
+class LatencyStats:
+    """Collects timing samples (in seconds) and summarises them as percentiles."""
+    def __init__(self, name, max_samples=10000):
+        self.name = name
+        self.max_samples = max_samples
+        self.samples = []
+
+    def add(self, seconds):
+        if len(self.samples) >= self.max_samples:
+            # Keep memory bounded on long runs, newest samples matter most
+            del self.samples[:self.max_samples // 2]
+        self.samples.append(seconds)
+
+    def summary(self):
+        """Return a dict of count/mean/p50/p95/p99/max in milliseconds."""
+        if not self.samples:
+            return {"count": 0}
+        ms = np.asarray(self.samples) * 1000
+        return {
+            "count": len(ms),
+            "mean": float(ms.mean()),
+            "p50": float(np.percentile(ms, 50)),
+            "p95": float(np.percentile(ms, 95)),
+            "p99": float(np.percentile(ms, 99)),
+            "max": float(ms.max()),
+            "stdev": float(ms.std()),
+        }
+
+    def report(self):
+        s = self.summary()
+        if s["count"] == 0:
+            return f"{self.name}: no samples"
+        return (f"{self.name}: n={s['count']} mean={s['mean']:.2f}ms p50={s['p50']:.2f}ms "
+                f"p95={s['p95']:.2f}ms p99={s['p99']:.2f}ms max={s['max']:.2f}ms jitter={s['stdev']:.2f}ms")
+
+
+class StartupProfile:
+    """Wall-clock breakdown of startup: timed steps plus milestones since process start.
+
+    Only the first run of each step or milestone is kept. The wake engine
+    repeats its steps whenever it restarts, and that isn't startup.
+    """
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.steps = []
+        self.milestones = []
+        self.recorded = set()
+        self.listening = threading.Event()
+
+    @contextmanager
+    def step(self, name):
+        """Time an import or init step, e.g. `with startup_profile.step("import pygame"):`"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if ("step", name) not in self.recorded:
+                self.recorded.add(("step", name))
+                self.steps.append((name, threading.current_thread().name, time.perf_counter() - start))
+
+    def mark(self, name):
+        if ("mark", name) not in self.recorded:
+            self.recorded.add(("mark", name))
+            self.milestones.append((name, time.perf_counter() - self.started))
+        if name == "listening":
+            self.listening.set()
+
+    def report(self):
+        lines = ["Startup profile:"]
+        for name, thread, seconds in self.steps:
+            lines.append(f"  {seconds * 1000:8.1f}ms  {name} [{thread}]")
+        for name, seconds in self.milestones:
+            lines.append(f"  {name} at {seconds * 1000:.0f}ms")
+        return "\n".join(lines)
+
+
+# Shared by main_ui.py and the wake engine, printed with --startup-profile
+startup_profile = StartupProfile()
@@ -5,7 +5,6 @@ import numpy as np
 import sounddevice as sd
 import soxr
 from openai import AsyncOpenAI
-from textual.app import App
 
 from config import (
     OPENAI_API_KEY, 
@@ -14,59 +13,156 @@ from config import (
     RECORDING_SAMPLE_RATE, 
     LLM_SAMPLE_RATE, 
     CHUNK_SIZE, 
-    CONVERSATION_TIMEOUT
+    FULL_DUPLEX,
+    TOOLS_ENABLED,
 )
 from audio_player import AudioPlayerAsync
-from audio_utils import ack_beep
+from connection_manager import ConnectionManager
+from session_policy import ConversationPolicy
+from tools import ToolExecutor, registry
+from transcript import Transcript
+from echo_canceller import EchoCanceller, ReferenceBuffer
+from audio_utils import earcons
+from wake_word import preroll
 
 
-class RealtimeClient(App[None]):
-    def __init__(self, interrupt_event):
-        super().__init__()
+class RealtimeClient:
+    """Headless conversation: console captions, no UI"""
+    def __init__(self, interrupt_event, client=None):
         self.interrupt_event = interrupt_event
         self.audio_buffer = b''
         self.audio_player = AudioPlayerAsync()
-        self.connection = None
-        self.client = AsyncOpenAI(api_key=OPENAI_API_KEY)
-        self.connected = asyncio.Event()
+        self.client = client or AsyncOpenAI(api_key=OPENAI_API_KEY)
         self.should_send_audio = asyncio.Event()
-        self.last_response = time.time()
+        self.policy = ConversationPolicy()
+        self.transcript = Transcript(len, 80)  # console captions, wrapped at 80 characters
+        self.transcript_printed = 0
         self.session_config = SESSION_CONFIG
+        self.tools = None
+        if TOOLS_ENABLED:
+            self.tools = ToolExecutor(registry)
+            self.session_config = dict(SESSION_CONFIG, tools=registry.schemas(), tool_choice="auto")
+        self.link = ConnectionManager(self.client, "gpt-4o-realtime-preview-2025-06-03", self.session_config,
+                                      on_reconnect=self.resume)
+
+        # Full-duplex: the player output is the echo canceller's reference signal
+        self.echo_canceller = None
+        if FULL_DUPLEX:
+            self.audio_player.reference = ReferenceBuffer()
+            self.echo_canceller = EchoCanceller(self.audio_player.reference)
+        self.response_item_id = None
+        self.response_item_start = 0
+        self.playback_task = None
+        self.running = False
 
     async def cleanup(self):
         """Cleanup resources when interrupted"""
+        if self.tools:
+            self.tools.shutdown()
         if self.audio_player:
             self.audio_player.stop()
-        if self.connection:
-            await self.connection.close()
+            earcons.detach(self.audio_player)
+        await self.link.close()
         self.should_send_audio.set()  # Allow recording to continue
-        self.exit()
+        self.running = False
 
-    async def on_mount(self) -> None:
-        self.run_worker(self.connect())
-        self.run_worker(self.send_audio())
-        self.run_worker(self.check_interrupt())  # Add interrupt checker
-        self.last_response = time.time()
+    async def start(self):
+        """Run one conversation until it times out, is interrupted or fails"""
+        self.running = True
+        earcons.attach(self.audio_player)
+        tasks = [
+            asyncio.create_task(self.connect()),
+            asyncio.create_task(self.send_audio()),
+            asyncio.create_task(self.check_interrupt()),
+        ]
+        self.policy.start()
         self.should_send_audio.set()
 
+        try:
+            await asyncio.gather(*tasks)
+        except Exception as e:
+            print(f"Error in realtime client: {e}")
+            earcons.play("error")
+        finally:
+            self.policy.finish("closed")
+            await self.cleanup()
+
     async def check_interrupt(self):
         """Check for interrupt signal"""
-        while True:
+        while self.running:
             if self.interrupt_event.is_set():
+                earcons.play("interrupted")
+                self.policy.finish("interrupted")
                 await self.cleanup()
                 break
             await asyncio.sleep(0.1)
 
-    async def _get_connection(self):
-        await self.connected.wait()
-        assert self.connection is not None
-        return self.connection
+    def track_response_item(self, item_id):
+        """Remember which item is playing so a barge-in can truncate it"""
+        if self.playback_task:
+            self.playback_task.cancel()
+            self.playback_task = None
+        if item_id != self.response_item_id:
+            self.response_item_id = item_id
+            self.response_item_start = self.audio_player.samples_played
+
+    async def barge_in(self, conn):
+        """Stop playback the instant the user starts talking over the assistant"""
+        print("Barge-in: user started speaking")
+        if self.playback_task:
+            self.playback_task.cancel()
+            self.playback_task = None
+        played = self.audio_player.samples_played - self.response_item_start
+        self.audio_player.stop()
+        if self.response_item_id:
+            # Server VAD cancels the response itself, tell it how much was actually heard
+            await conn.conversation.item.truncate(
+                item_id=self.response_item_id,
+                content_index=0,
+                audio_end_ms=int(played * 1000 / self.audio_player.SAMPLE_RATE),
+            )
+            self.response_item_id = None
+        self.policy.on_response_done()
+
+    async def finish_playback(self):
+        """Wait for queued audio to play out, then release the speaker"""
+        while len(self.audio_player.queue) > 0:
+            await asyncio.sleep(0.1)
+        self.audio_player.stop()
+        self.response_item_id = None
+        self.playback_task = None
+        self.policy.on_response_done()
+
+    def resume(self):
+        """The connection came back, the response that was in flight won't finish"""
+        if self.playback_task:
+            self.playback_task.cancel()
+            self.playback_task = None
+        self.response_item_id = None
+        if self.tools:
+            self.tools.reset()
+        if self.policy.responding:
+            self.policy.on_response_done()
+        self.should_send_audio.set()
+
+    async def send_preroll(self, until):
+        """Send what the wake mic heard between the wake word and the session mic's first sample.
+
+        Never waits for the connection, link.append() buffers until it is up.
+        """
+        pcm, sample_rate = preroll.take(until)
+        if not pcm.size:
+            return
+        audio_resampled = soxr.resample(pcm, sample_rate, LLM_SAMPLE_RATE)
+        await self.link.append(audio_resampled)
+        self.policy.on_audio(pcm, sample_rate)
+        print(f"Sent {pcm.size / sample_rate:.2f}s of pre-roll audio")
 
     async def send_audio(self):
         """Record audio and send to LLM"""
         print("Recording audio")
-        # Play acknowledgement beep
-        ack_beep()
+        # Acknowledgement cue, returns immediately
+        earcons.play("wake")
         
         # Audio will need to be resampled to 24kHz for the LLM
         rs_to_llm = soxr.ResampleStream(
@@ -83,36 +179,50 @@ class RealtimeClient(App[None]):
             dtype="int16",
         )
         stream.start()
+        if self.echo_canceller:
+            self.audio_player.reference.input_latency = stream.latency
+        preroll_sent = False
 
         try:
-            while True:
-                if stream.read_available < CHUNK_SIZE:
+            while self.running:
+                available = stream.read_available
+                if available < CHUNK_SIZE:
                     await asyncio.sleep(0)
                     continue
                 
+                if not preroll_sent:
+                    # Up to the oldest sample still in the mic buffer: however late this first
+                    # read is, or if the buffer overflowed, the wake mic covers the rest
+                    await self.send_preroll(time.monotonic() - stream.latency - available / RECORDING_SAMPLE_RATE)
+                    preroll_sent = True
+                
                 data, _ = stream.read(CHUNK_SIZE)
      
-                connection = await self._get_connection()
 
                 audio = np.frombuffer(data, dtype=np.int16)
                 audio_resampled = rs_to_llm.resample_chunk(audio)
+                if self.echo_canceller:
+                    audio_resampled = self.echo_canceller.process(audio_resampled)
                 if not audio_resampled.size > 0:
                     await asyncio.sleep(0)
                     continue
 
                 # wait to see if audio can be recorded
                 await self.should_send_audio.wait()
-                # Encode and send audio chunk through the API connection
-                await connection.input_audio_buffer.append(
-                    audio=base64.b64encode(audio_resampled).decode("utf-8")
-                )
+                # Send through the API connection, buffered while it reconnects
+                await self.link.append(audio_resampled)
+                
+                self.policy.on_audio(audio, RECORDING_SAMPLE_RATE)
                 
-                # If timeout seconds have passed since the last response was received,
-                # we end the chat. We don't want this to be constantly recording and processing audio.
-                if time.time() - self.last_response > CONVERSATION_TIMEOUT:
-                    stream.stop()
-                    stream.close()
-                    self.exit()
+                # End the chat once the policy says nobody is talking anymore.
+                # We don't want this to be constantly recording and processing audio.
+                reason = self.policy.should_end()
+                if reason and not (self.tools and self.tools.pending):
+                    self.policy.finish(reason)
+                    earcons.play("timeout")
+                    self.running = False
+                    await self.link.close()
+                    return
                 await asyncio.sleep(0)
         
         except KeyboardInterrupt:
@@ -124,42 +234,87 @@ class RealtimeClient(App[None]):
             
     async def connect(self):        
         """Handle API connection and response events"""
-        async with self.client.beta.realtime.connect(model="gpt-4o-realtime-preview-2025-06-03") as conn:
-            await conn.session.update(session=self.session_config)
-            self.connection = conn
-            self.connected.set()
-            
-            # Need to resample for output. May not be needed if the output can take 24kHz directly
-            self.rs_to_output = soxr.ResampleStream(
-                LLM_SAMPLE_RATE,         # input samplerate
-                RECORDING_SAMPLE_RATE,   # target samplerate
-                1,                       # channel(s)
-                dtype='int16'            # data type
-            )
-            
-            async for event in conn:
-                print(event.type)
-                if event.type == 'error':
-                    print(event.error.type)
-                    print(event.error.code)
-                    print(event.error.event_id)
-                    print(event.error.message)
-             
-                elif event.type == "response.audio.delta":
+        # Need to resample for output. May not be needed if the output can take 24kHz directly
+        self.rs_to_output = soxr.ResampleStream(
+            LLM_SAMPLE_RATE,         # input samplerate
+            RECORDING_SAMPLE_RATE,   # target samplerate
+            1,                       # channel(s)
+            dtype='int16'            # data type
+        )
+        
+        async for conn, event in self.link.events():
+            if not self.running:
+                break
+
+            print(event.type)
+            if event.type == 'error':
+                print(event.error.type)
+                print(event.error.code)
+                print(event.error.event_id)
+                print(event.error.message)
+         
+            elif event.type == "response.audio.delta":
+                self.policy.on_response_audio()
+                if FULL_DUPLEX:
+                    # keep recording, the echo canceller removes our own voice
+                    self.track_response_item(event.item_id)
+                else:
                     # receiving response so we stop recording, or it would be interrupting itself
                     self.should_send_audio.clear()
-                   
-                    # decode and add data to the audio player buffer
-                    bytes_data = base64.b64decode(event.delta)
-                    self.audio_player.add_data(bytes_data)
-                    continue
-                    
-                elif event.type == "response.done":
-                    # The API is done responding
-                    # The audio player is closed and we can start recording again
-                    while len(self.audio_player.queue) > 0:
-                        await asyncio.sleep(0.1)
-                    self.audio_player.stop()
-                    self.last_response = time.time()
-                    self.should_send_audio.set()
-                    continue
\ No newline at end of file
+               
+                # decode and add data to the audio player buffer
+                bytes_data = base64.b64decode(event.delta)
+                self.audio_player.add_data(bytes_data)
+                continue
+                
+            elif event.type == "input_audio_buffer.speech_started":
+                self.policy.on_speech_started()
+                if FULL_DUPLEX and self.audio_player.playing:
+                    await self.barge_in(conn)
+                continue
+
+            elif event.type == "input_audio_buffer.speech_stopped":
+                self.policy.on_speech_stopped()
+                continue
+
+            elif event.type == "response.created":
+                self.policy.on_response()
+                if self.tools:
+                    self.tools.response_started()
+                continue
+
+            elif (event.type == "response.output_item.done" and event.item.type == "function_call"
+                  and self.tools):
+                # The finished item carries the name, the arguments.done event doesn't.
+                # Runs in the background, audio keeps flowing while the tool works
+                item = event.item
+                self.tools.submit(conn, item.call_id, item.name, item.arguments)
+                continue
+
+            if event.type == "response.done" and self.tools:
+                await self.tools.response_done(conn)
+
+            if event.type == "response.done" and FULL_DUPLEX:
+                # Drain playback in the background so barge-in events are still handled
+                self.playback_task = asyncio.create_task(self.finish_playback())
+                continue
+
+            elif event.type == "response.done":
+                # The API is done responding
+                # The audio player is closed and we can start recording again
+                while len(self.audio_player.queue) > 0:
+                    await asyncio.sleep(0.1)
+                self.audio_player.stop()
+                self.policy.on_response_done()
+                self.should_send_audio.set()
+                continue
+
+            elif event.type in ("response.audio_transcript.delta", "response.audio_transcript.done"):
+                if event.type.endswith("delta"):
+                    self.transcript.append(event.delta)
+                else:
+                    self.transcript.end_turn()
+                for line in self.transcript.lines_since(self.transcript_printed):
+                    print(f"> {line}")
+                self.transcript_printed = self.transcript.finished
+                continue
\ No newline at end of file
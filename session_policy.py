@@ -0,0 +1,141 @@
+import time
+from collections import Counter
+import numpy as np
+from metrics import sessions, session_duration, time_to_first_audio
+from config import (
+    CONVERSATION_POLICY,
+    CONVERSATION_TIMEOUT,
+    CONVERSATION_SILENCE_S,
+    CONVERSATION_RESPONSE_WAIT_S,
+    CONVERSATION_MAX_SPEECH_S,
+    CONVERSATION_VOICE_DB,
+)
+
+
+class ConversationStats:
+    """Totals across sessions: how much audio was streamed and how much the policy saved.
+
+    Saved time is signed: a session the policy kept going past the fixed
+    timeout counts against it, and is counted as extended.
+    """
+    def __init__(self):
+        self.sessions = 0
+        self.streamed_seconds = 0.0
+        self.saved_seconds = 0.0
+        self.extended = 0
+        self.end_reasons = Counter()
+
+    def add(self, streamed, saved, reason):
+        self.sessions += 1
+        self.streamed_seconds += streamed
+        self.saved_seconds += saved
+        if saved < 0:
+            self.extended += 1
+        self.end_reasons[reason] += 1
+
+    def report(self):
+        reasons = ", ".join(f"{reason}={count}" for reason, count in self.end_reasons.items()) or "none"
+        return (f"Conversations: n={self.sessions} streamed={self.streamed_seconds:.1f}s "
+                f"saved={self.saved_seconds:.1f}s vs fixed timeout ({self.extended} extended past it), "
+                f"ended by {reasons}")
+
+
+conversation_stats = ConversationStats()
+
+
+class ConversationPolicy:
+    """Decides when a conversation is over.
+
+    "fixed" keeps the old behaviour: end CONVERSATION_TIMEOUT after the last
+    response. "speech" follows the server VAD events and the local mic level:
+    it never ends while someone is talking or the assistant is answering,
+    waits CONVERSATION_RESPONSE_WAIT_S for a reply after the user stops, and
+    otherwise ends after CONVERSATION_SILENCE_S of real silence.
+    CONVERSATION_TIMEOUT stays as the upper bound when only local noise keeps
+    a session alive.
+    """
+    def __init__(self, mode=CONVERSATION_POLICY):
+        self.mode = mode
+        self.start()
+
+    def start(self):
+        now = time.monotonic()
+        self.started = now
+        self.last_activity = now  # session start or the end of the last response
+        self.last_voice = 0.0  # local mic level above the noise floor
+        self.speech_since = None  # server VAD says the user is talking
+        self.awaiting_since = None  # user stopped, no response yet
+        self.turn_ended = None  # user stopped, no reply audio yet
+        self.responding = False
+        self.noise_floor = None
+        self.streamed_seconds = 0.0
+        self.ended = False
+
+    def touch(self):
+        self.last_activity = time.monotonic()
+
+    def on_speech_started(self):
+        self.speech_since = time.monotonic()
+        self.awaiting_since = None
+
+    def on_speech_stopped(self):
+        self.speech_since = None
+        self.awaiting_since = self.turn_ended = time.monotonic()
+
+    def on_response(self):
+        self.responding = True
+        self.awaiting_since = None
+
+    def on_response_audio(self):
+        """A chunk of reply audio arrived"""
+        if self.turn_ended is not None:
+            time_to_first_audio.observe(time.monotonic() - self.turn_ended)
+            self.turn_ended = None
+
+    def on_response_done(self):
+        """Response finished playing (or was cut off by a barge-in)"""
+        self.responding = False
+        self.touch()
+
+    def on_audio(self, samples, sample_rate):
+        """Track a chunk of int16 mic audio that was streamed to the server"""
+        self.streamed_seconds += len(samples) / sample_rate
+        level = 10 * np.log10(np.mean(samples.astype(np.float32) ** 2) + 1e-9)
+        if self.noise_floor is None or level < self.noise_floor:
+            self.noise_floor = level  # fall fast
+        else:
+            self.noise_floor += min(level - self.noise_floor, 0.05)  # rise slowly
+        if level > self.noise_floor + CONVERSATION_VOICE_DB:
+            self.last_voice = time.monotonic()
+
+    def should_end(self):
+        """Return why the conversation should end now, or None to keep going"""
+        now = time.monotonic()
+        idle = now - self.last_activity
+        if self.mode == "fixed":
+            return "timeout" if idle > CONVERSATION_TIMEOUT else None
+
+        if self.responding:
+            return None
+        if self.speech_since is not None and now - self.speech_since < CONVERSATION_MAX_SPEECH_S:
+            return None
+        if self.awaiting_since is not None:
+            return "no response" if now - self.awaiting_since > CONVERSATION_RESPONSE_WAIT_S else None
+        if now - max(self.last_activity, self.last_voice) > CONVERSATION_SILENCE_S:
+            return "silence"
+        if idle > CONVERSATION_TIMEOUT:
+            return "timeout"
+        return None
+
+    def finish(self, reason):
+        """Record the session in conversation_stats and log how it ended, once"""
+        if self.ended:
+            return
+        self.ended = True
+        idle = time.monotonic() - self.last_activity
+        saved = CONVERSATION_TIMEOUT - idle  # negative if the session ran past the fixed timeout
+        conversation_stats.add(self.streamed_seconds, saved, reason)
+        sessions.labels(reason).inc()
+        session_duration.observe(time.monotonic() - self.started)
+        print(f"Conversation ended ({reason}) after {idle:.1f}s idle, "
+              f"{self.streamed_seconds:.1f}s streamed, {saved:+.1f}s saved vs fixed timeout")
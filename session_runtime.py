@@ -0,0 +1,139 @@
+import asyncio
+import threading
+import time
+from perf_stats import LatencyStats
+from metrics import loop_lag
+from watchdog import watchdog
+
+# Wake to the conversation coroutine running, on the already warm loop
+session_setup_stats = LatencyStats("Session setup")
+
+
+class SessionRuntime:
+    """One long-lived event loop thread that runs the conversations.
+
+    Replaces a new thread, event loop (and, headless, a Textual App) per wake.
+    wake() can be called from any thread and starts `run_session()` on the
+    loop. When a conversation is already running it sets the interrupt event
+    and starts the new one once the old one has cleaned up, so there is never
+    more than one. The loop and everything bound to it (the OpenAI client,
+    imported modules) stay warm between conversations.
+
+    The loop checks in with the watchdog from its lag probe; restart() is
+    the watchdog's way out when the loop stops doing so.
+    """
+    def __init__(self, run_session, interrupt_event):
+        self.run_session = run_session  # coroutine function running one conversation to the end
+        self.interrupt_event = interrupt_event
+        self.loop = asyncio.new_event_loop()
+        self.loop_lock = threading.Lock()  # wake() never posts to a loop restart() is swapping out
+        self.thread = threading.Thread(target=self._run, args=(self.loop,), name="session-runtime", daemon=True)
+        self.session = None  # asyncio.Task of the running conversation
+        self.lag_probe = None
+        self.restarting = False  # the running conversation is being interrupted for a new one
+        self.stopping = False
+        self.sessions = 0
+        self.restarts = 0
+
+    def start(self):
+        self.thread.start()
+
+    def _run(self, loop):
+        asyncio.set_event_loop(loop)
+        self.lag_probe = loop.create_task(self._measure_lag())
+        loop.run_forever()
+
+    async def _measure_lag(self, interval=0.05):
+        """How late the loop wakes up, anything blocking it shows up here"""
+        while True:
+            watchdog.beat("session loop")
+            expected = time.perf_counter() + interval
+            await asyncio.sleep(interval)
+            loop_lag.observe(max(0.0, time.perf_counter() - expected))
+
+    @property
+    def active(self):
+        return self.session is not None and not self.session.done()
+
+    def wake(self):
+        """Start a conversation, ending the one running first. Returns immediately"""
+        with self.loop_lock:
+            self.loop.call_soon_threadsafe(self._on_wake, self.loop, time.perf_counter())
+
+    def _on_wake(self, loop, woken_at):
+        if loop is not self.loop:
+            # Posted just before a restart, the old loop only got to it now
+            with self.loop_lock:
+                self.loop.call_soon_threadsafe(self._on_wake, self.loop, woken_at)
+            return
+        if self.restarting or self.stopping:
+            return  # Already ending the last conversation to start a new one
+        previous = self.session if self.active else None
+        if previous:
+            self.interrupt_event.set()
+            self.restarting = True
+        self.sessions += 1
+        self.session = self.loop.create_task(self._converse(woken_at, previous))
+
+    async def _converse(self, woken_at, previous=None):
+        if previous:
+            await asyncio.wait({previous})
+            self.restarting = False
+            if self.stopping:
+                return
+        else:
+            session_setup_stats.add(time.perf_counter() - woken_at)
+        self.interrupt_event.clear()
+        try:
+            await self.run_session()
+        except Exception as e:
+            print(f"Error in conversation: {e}")
+        finally:
+            # Ready for the next wake word, a leftover interrupt would swallow it
+            self.interrupt_event.clear()
+
+    def restart(self):
+        """Carry on with a fresh loop thread, from any thread.
+
+        A thread stuck in a blocking call can't be stopped, so the old loop
+        is left behind with a request to cancel its conversation and stop
+        as soon as it runs again.
+        """
+        with self.loop_lock:
+            old_loop = self.loop
+            self.restarts += 1
+            self.loop = asyncio.new_event_loop()
+            self.session = None
+            self.restarting = False
+            self.thread = threading.Thread(target=self._run, args=(self.loop,), name="session-runtime", daemon=True)
+            self.thread.start()
+        old_loop.call_soon_threadsafe(self._retire, old_loop)
+
+    def _retire(self, loop):
+        """Cancel the conversation and lag probe left on an abandoned loop, then stop it"""
+        tasks = asyncio.all_tasks(loop)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            loop.create_task(asyncio.wait(tasks)).add_done_callback(lambda _: loop.stop())
+        else:
+            loop.stop()
+
+    async def _shutdown(self):
+        self.stopping = True
+        self.lag_probe.cancel()
+        watchdog.forget("session loop")
+        if self.active:
+            self.interrupt_event.set()
+            await asyncio.wait({self.session})
+
+    def stop(self, timeout=3.0):
+        """End the running conversation and the loop thread"""
+        if not self.thread.is_alive():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result(timeout)
+        except Exception as e:
+            print(f"Conversation didn't end cleanly: {e!r}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout)
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""Long-run soak test for resource leaks.
+
+Usage:
+    python3 soak.py [--cycles N] [--sample-every N] [--json FILE]
+
+Drives wake -> converse -> end cycles through the SessionRuntime and the
+headless RealtimeClient, as many as a kiosk sees in weeks, against the
+local stand-in server (standin_server.py) and fake audio devices: the mic
+plays a burst of speech then room noise, the speaker and earcon streams run
+their callbacks on a timer thread like PortAudio does. Cycles rotate
+between ending on silence after a reply, being interrupted and being
+restarted by a second wake word. Conversation timings are shortened so a
+cycle takes about a second.
+
+RSS, thread count, open fds and tracemalloc totals are sampled as it runs.
+It fails if any of them grows beyond its threshold between the end of the
+warm-up and the end of the run, and prints the allocation sites that grew
+the most. Linux only (reads /proc).
+"""
+
+import argparse
+import asyncio
+import contextlib
+import faulthandler
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+import sounddevice as sd
+from openai import AsyncOpenAI
+from websockets.asyncio.server import serve
+
+import session_policy
+from audio_utils import earcons
+from realtime_client import RealtimeClient
+from session_runtime import SessionRuntime, session_setup_stats
+from standin_server import StandInServer
+
+SPEECH_S = 0.4  # speech at the start of each conversation, then room noise
+
+
+class FakeInputStream:
+    """sounddevice.InputStream stand-in that produces audio in real time"""
+    def __init__(self, samplerate, channels=1, dtype="int16", device=None, **kwargs):
+        self.samplerate = samplerate
+        self.latency = 0.01
+        self.started = None
+        self.position = 0
+
+    def start(self):
+        self.started = time.monotonic()
+
+    @property
+    def read_available(self):
+        return int((time.monotonic() - self.started) * self.samplerate) - self.position
+
+    def read(self, frames):
+        t = (self.position + np.arange(frames)) / self.samplerate
+        if t[0] < SPEECH_S:
+            audio = 4000 * np.sin(2 * np.pi * 180 * t) * (0.5 + 0.5 * np.sin(2 * np.pi * 4 * t) ** 2)
+        else:
+            audio = np.random.normal(0, 30, frames)
+        self.position += frames
+        return audio.astype(np.int16).reshape(-1, 1), False
+
+    def stop(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeOutputStream:
+    """sounddevice.OutputStream stand-in that calls the callback from its own thread"""
+    def __init__(self, samplerate, blocksize, callback, channels=1, dtype="int16", device=None, **kwargs):
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.callback = callback
+        self.latency = 0.02
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="fake-output", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        outdata = np.zeros((self.blocksize, 1), dtype=np.int16)
+        while not self.stopped.wait(self.blocksize / self.samplerate):
+            self.callback(outdata, self.blocksize, None, None)
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join()
+
+    def abort(self):
+        self.stop()
+
+    def close(self):
+        self.stop()
+
+
+def use_fake_devices():
+    sd.InputStream = FakeInputStream
+    sd.OutputStream = FakeOutputStream
+    # A cycle in about a second instead of ten
+    session_policy.CONVERSATION_SILENCE_S = 0.5
+    session_policy.CONVERSATION_RESPONSE_WAIT_S = 1.0
+    session_policy.CONVERSATION_TIMEOUT = 3.0
+
+
+def start_server(server):
+    """Run the stand-in server on its own loop thread, return its URL"""
+    ready = threading.Event()
+    url = []
+
+    async def run():
+        async with serve(server.handle, "127.0.0.1", 0) as ws_server:
+            url.append(f"ws://127.0.0.1:{ws_server.sockets[0].getsockname()[1]}/v1")
+            ready.set()
+            await asyncio.Future()
+
+    threading.Thread(target=lambda: asyncio.run(run()), name="standin-server", daemon=True).start()
+    ready.wait()
+    return url[0]
+
+
+def sample(cycle):
+    with open("/proc/self/statm") as f:
+        rss_pages = int(f.read().split()[1])
+    return {
+        "cycle": cycle,
+        "time": time.monotonic(),
+        "rss_mb": rss_pages * os.sysconf("SC_PAGE_SIZE") / 2 ** 20,
+        "threads": threading.active_count(),
+        "fds": len(os.listdir("/proc/self/fd")),
+        "traced_mb": tracemalloc.get_traced_memory()[0] / 2 ** 20,
+    }
+
+
+def wait_for(condition, timeout):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def run_cycle(cycle, runtime, interrupt_event, timeout):
+    """One wake and whatever ends the conversation, False if it got stuck"""
+    runtime.wake()
+    if not wait_for(lambda: runtime.active, timeout):
+        return False
+    kind = cycle % 3
+    if kind == 1:
+        time.sleep(0.2)
+        interrupt_event.set()  # what saying the wake word mid-conversation used to do
+    elif kind == 2:
+        time.sleep(0.2)
+        runtime.wake()  # the wake word again: end this conversation and start another
+        time.sleep(0.05)
+    return wait_for(lambda: not runtime.active, timeout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak the conversation cycle and watch for leaks")
+    parser.add_argument("--cycles", type=int, default=1000, help="wake cycles to run")
+    parser.add_argument("--warmup", type=int, default=30, help="cycles before the baseline sample")
+    parser.add_argument("--sample-every", type=int, default=50, help="cycles between samples")
+    parser.add_argument("--cycle-timeout", type=float, default=15.0, help="seconds before a cycle counts as stuck")
+    parser.add_argument("--max-rss-mb", type=float, default=20.0, help="allowed RSS growth")
+    parser.add_argument("--max-threads", type=int, default=2, help="allowed thread count growth")
+    parser.add_argument("--max-fds", type=int, default=4, help="allowed open fd growth")
+    parser.add_argument("--max-traced-mb", type=float, default=5.0, help="allowed Python heap growth")
+    parser.add_argument("--top", type=int, default=10, help="allocation sites to show")
+    parser.add_argument("--json", metavar="FILE", help="write the samples as JSON")
+    args = parser.parse_args()
+
+    use_fake_devices()
+    server = StandInServer(respond_after=0.3, response_s=0.3)
+    client = AsyncOpenAI(api_key="soak", websocket_base_url=start_server(server))
+    client.beta.realtime  # lazily imported by the SDK, slow under tracemalloc and not a leak
+    tracemalloc.start(10)
+    interrupt_event = threading.Event()
+
+    async def converse():
+        await RealtimeClient(interrupt_event, client).start()
+
+    runtime = SessionRuntime(converse, interrupt_event)
+    runtime.start()
+
+    samples = []
+    baseline = None
+    stuck = 0
+    started = time.monotonic()
+    # The clients log every event, keep the console for the progress lines
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for cycle in range(1, args.cycles + 1):
+            if not run_cycle(cycle, runtime, interrupt_event, args.cycle_timeout):
+                stuck += 1
+                print(f"cycle {cycle} stuck, stacks:", file=sys.__stdout__)
+                faulthandler.dump_traceback(file=sys.__stdout__)
+                if runtime.session:
+                    runtime.session.print_stack(file=sys.__stdout__)
+                interrupt_event.set()
+                wait_for(lambda: not runtime.active, args.cycle_timeout)
+            if cycle == args.warmup:
+                baseline = tracemalloc.take_snapshot()
+            if cycle == args.warmup or cycle % args.sample_every == 0 or cycle == args.cycles:
+                samples.append(sample(cycle))
+                s = samples[-1]
+                print(f"cycle {cycle:6d}  {time.monotonic() - started:7.0f}s  rss={s['rss_mb']:.1f}MB "
+                      f"threads={s['threads']} fds={s['fds']} traced={s['traced_mb']:.1f}MB stuck={stuck}",
+                      file=sys.__stdout__, flush=True)
+        runtime.stop()
+        earcons.stop()
+
+    print(f"Server: {server.sessions} sessions, {server.responses} responses, {server.audio_seconds:.0f}s of audio")
+    print(session_policy.conversation_stats.report())
+    print(session_setup_stats.report())
+
+    ok = stuck == 0
+    if stuck:
+        print(f"FAIL: {stuck} cycles got stuck")
+    after_warmup = [s for s in samples if s["cycle"] >= args.warmup]
+    if baseline is not None and len(after_warmup) >= 2:
+        first = after_warmup[0]
+        # Lowest value over the last quarter, so one busy moment doesn't count as a leak
+        tail = after_warmup[-max(1, len(after_warmup) // 4):]
+        limits = {"rss_mb": args.max_rss_mb, "threads": args.max_threads,
+                  "fds": args.max_fds, "traced_mb": args.max_traced_mb}
+        for key, limit in limits.items():
+            growth = min(s[key] for s in tail) - first[key]
+            verdict = "ok" if growth <= limit else "FAIL"
+            ok = ok and growth <= limit
+            print(f"{key:10s} {first[key]:8.1f} -> {tail[-1][key]:8.1f}  growth {growth:+.1f} (limit {limit})  {verdict}")
+
+        print(f"Top allocation growth since cycle {args.warmup}:")
+        for stat in tracemalloc.take_snapshot().compare_to(baseline, "lineno")[:args.top]:
+            print(f"  {stat}")
+        print("Threads still running:", ", ".join(sorted(t.name for t in threading.enumerate())))
+    else:
+        print("Not enough cycles after the warm-up to judge growth")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "stuck": stuck, "samples": samples}, f, indent=2)
+        print(f"Wrote {args.json}")
+    print("PASS" if ok else "FAIL")
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Local stand-in for the realtime API, used by drill_reconnect.py and soak.py.
+
+Speaks just enough of the protocol for a session: answers session.update,
+accepts audio and conversation items (echoing them back as created), and can
+answer the audio with a short spoken response, transcribing the user's turn
+first if the session asked for input transcription. It can also drop every connection after a while and refuse
+the following connection attempts, to rehearse network trouble.
+"""
+
+import asyncio
+import base64
+import json
+
+import numpy as np
+
+from config import LLM_SAMPLE_RATE
+
+
+def server_event(type, **fields):
+    return json.dumps(dict(type=type, event_id="standin", **fields))
+
+
+class StandInServer:
+    def __init__(self, drop_every=None, refuse=0, respond_after=None, response_s=0.5):
+        self.drop_every = drop_every  # seconds each connection lives, None keeps it open
+        self.refuse = refuse  # connection attempts answered with 503 after each drop
+        self.respond_after = respond_after  # seconds of speech before each canned response, None never responds
+        self.response_s = response_s
+        self.refusing = 0
+        self.sessions = 0
+        self.session_updates = 0
+        self.context_items = []  # conversation items created, per session
+        self.restored = []  # the items themselves, per session
+        self.audio_seconds = 0.0
+        self.responses = 0
+        self.aborts = 0
+
+    def process_request(self, connection, request):
+        if self.refusing > 0:
+            self.refusing -= 1
+            return connection.respond(503, "stand-in: service unavailable\n")
+        return None
+
+    def on_audio(self, audio):
+        """Hook for int16 audio received from input_audio_buffer.append"""
+
+    async def handle(self, ws):
+        self.sessions += 1
+        self.context_items.append(0)
+        self.restored.append([])
+        transcribe = False
+        await ws.send(server_event("session.created", session={}))
+        loop = asyncio.get_running_loop()
+        drop_at = loop.time() + self.drop_every if self.drop_every else None
+        heard = 0.0
+        try:
+            while True:
+                timeout = None if drop_at is None else max(0.0, drop_at - loop.time())
+                try:
+                    message = await asyncio.wait_for(ws.recv(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                event = json.loads(message)
+                if event["type"] == "session.update":
+                    self.session_updates += 1
+                    transcribe = bool(event["session"].get("input_audio_transcription"))
+                    await ws.send(server_event("session.updated", session={}))
+                elif event["type"] == "conversation.item.create":
+                    self.context_items[-1] += 1
+                    self.restored[-1].append(event["item"])
+                    item = dict(event["item"], id=f"item_{self.context_items[-1]}", object="realtime.item")
+                    await ws.send(server_event("conversation.item.created", previous_item_id=None, item=item))
+                elif event["type"] == "input_audio_buffer.append":
+                    audio = np.frombuffer(base64.b64decode(event["audio"]), dtype=np.int16)
+                    self.audio_seconds += len(audio) / LLM_SAMPLE_RATE
+                    self.on_audio(audio)
+                    # Crude VAD, only speech counts towards a response
+                    if np.abs(audio.astype(np.float32)).mean() > 300:
+                        heard += len(audio) / LLM_SAMPLE_RATE
+                    if self.respond_after is not None and heard >= self.respond_after:
+                        heard = 0.0
+                        await self.respond(ws, transcribe)
+        except Exception:
+            return  # the client went away
+        self.refusing = self.refuse
+        if self.sessions % 2:
+            self.aborts += 1
+            ws.transport.abort()  # like the network going away
+        else:
+            await ws.close(1011, "stand-in")  # like the server restarting
+
+    async def respond(self, ws, transcribe=False):
+        """A turn as the real API sends it: VAD events, audio and transcript deltas, response.done"""
+        self.responses += 1
+        await ws.send(server_event("input_audio_buffer.speech_started", audio_start_ms=0, item_id="in"))
+        await ws.send(server_event("input_audio_buffer.speech_stopped", audio_end_ms=0, item_id="in"))
+        if transcribe:
+            await ws.send(server_event("conversation.item.input_audio_transcription.completed",
+                                       item_id="in", content_index=0, transcript="hum"))
+        await ws.send(server_event("response.created", response={"id": "resp"}))
+        chunk = int(0.1 * LLM_SAMPLE_RATE)
+        t = np.arange(chunk) / LLM_SAMPLE_RATE
+        tone = (3000 * np.sin(2 * np.pi * 220 * t)).astype(np.int16).tobytes()
+        for _ in range(int(self.response_s / 0.1)):
+            await ws.send(server_event("response.audio.delta", response_id="resp", item_id="out",
+                                       output_index=0, content_index=0,
+                                       delta=base64.b64encode(tone).decode("utf-8")))
+            await ws.send(server_event("response.audio_transcript.delta", response_id="resp", item_id="out",
+                                       output_index=0, content_index=0, delta="la "))
+        await ws.send(server_event("response.audio_transcript.done", response_id="resp", item_id="out",
+                                   output_index=0, content_index=0, transcript="la " * int(self.response_s / 0.1)))
+        await ws.send(server_event("response.done", response={"id": "resp", "status": "completed"}))
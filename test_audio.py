@@ -84,11 +84,13 @@ def test_audio_pipeline():
     
     try:
         from audio_player import AudioPlayerAsync
-        from audio_utils import ack_beep
+        from audio_utils import earcons
         
-        print("Testing acknowledgment beep...")
-        ack_beep()
-        time.sleep(1)
+        print("Testing earcons...")
+        for name in ("wake", "timeout", "interrupted", "error"):
+            earcons.play(name)
+            time.sleep(0.6)
+        earcons.stop()
         
         print("Testing audio player...")
         player = AudioPlayerAsync()
@@ -0,0 +1,193 @@
+import asyncio
+import inspect
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from config import TOOL_WORKERS, TOOL_TIMEOUT_S
+from perf_stats import LatencyStats
+
+tool_latency_stats = LatencyStats("Tool call latency")
+
+
+class Tool:
+    def __init__(self, func, name, description, parameters, timeout, max_concurrency, cache_ttl):
+        self.func = func
+        self.name = name
+        self.description = description
+        self.parameters = parameters
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.cache_ttl = cache_ttl  # seconds to reuse a result for identical arguments, 0 disables
+        self.is_async = inspect.iscoroutinefunction(func)
+
+    def schema(self):
+        return {"type": "function", "name": self.name, "description": self.description, "parameters": self.parameters}
+
+
+class ToolRegistry:
+    """Functions the assistant may call, registered with the @registry.tool(...) decorator."""
+    def __init__(self):
+        self.tools = {}
+
+    def tool(self, description, parameters=None, name=None, timeout=TOOL_TIMEOUT_S, max_concurrency=2, cache_ttl=0):
+        def register(func):
+            tool_name = name or func.__name__
+            schema = parameters or {"type": "object", "properties": {}}
+            self.tools[tool_name] = Tool(func, tool_name, description, schema, timeout, max_concurrency, cache_ttl)
+            return func
+        return register
+
+    def schemas(self):
+        """Tool definitions for session.update"""
+        return [tool.schema() for tool in self.tools.values()]
+
+
+class ToolExecutor:
+    """Runs tool calls off the event loop and sends the results back to the session.
+
+    Sync tools run in a bounded thread pool, async tools as tasks, each with
+    its own timeout and concurrency limit. connect() only calls submit(), so
+    audio deltas and the mic uplink keep flowing while tools run. Outputs are
+    added with conversation.item.create as they finish, and one
+    response.create follows once no calls are pending and the model isn't
+    already responding.
+    """
+    def __init__(self, registry, max_workers=TOOL_WORKERS):
+        self.registry = registry
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+        self.semaphores = {}
+        self.cache = {}
+        self.tasks = set()
+        self.pending = 0
+        self.outputs_ready = False
+        self.response_active = False
+
+    def submit(self, conn, call_id, name, arguments):
+        """Start a call in the background, returns immediately"""
+        self.pending += 1
+        task = asyncio.create_task(self._handle(conn, call_id, name, arguments))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    def response_started(self):
+        self.response_active = True
+
+    async def response_done(self, conn):
+        self.response_active = False
+        await self._maybe_respond(conn)
+
+    def reset(self):
+        """Forget response state after a reconnect, the new session has no response running"""
+        self.response_active = False
+        self.outputs_ready = False
+
+    async def _handle(self, conn, call_id, name, arguments):
+        try:
+            output = await self.run(name, arguments)
+            await conn.conversation.item.create(
+                item={"type": "function_call_output", "call_id": call_id, "output": output}
+            )
+            self.outputs_ready = True
+        except Exception as e:
+            print(f"Error returning result of tool {name}: {e}")
+        finally:
+            self.pending -= 1
+        try:
+            await self._maybe_respond(conn)
+        except Exception as e:
+            # Nobody awaits this task, an error left in it would never be seen
+            print(f"Error requesting a response to tool {name}: {e}")
+
+    async def _maybe_respond(self, conn):
+        # One response for all the outputs, the API rejects overlapping responses
+        if self.outputs_ready and self.pending == 0 and not self.response_active:
+            self.outputs_ready = False
+            self.response_active = True
+            try:
+                await conn.response.create()
+            except Exception:
+                # The outputs are still unanswered, the next response_done tries again
+                self.outputs_ready = True
+                self.response_active = False
+                raise
+
+    async def run(self, name, arguments):
+        """Call a tool with JSON arguments and return its result as a JSON string"""
+        tool = self.registry.tools.get(name)
+        if tool is None:
+            return json.dumps({"error": f"unknown tool {name}"})
+        try:
+            kwargs = json.loads(arguments) if arguments else {}
+        except json.JSONDecodeError as e:
+            return json.dumps({"error": f"invalid arguments: {e}"})
+
+        key = (name, json.dumps(kwargs, sort_keys=True))
+        cached = self.cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        if name not in self.semaphores:
+            self.semaphores[name] = asyncio.Semaphore(tool.max_concurrency)
+        semaphore = self.semaphores[name]
+        start = time.perf_counter()
+        async with semaphore:
+            try:
+                if tool.is_async:
+                    result = await asyncio.wait_for(tool.func(**kwargs), tool.timeout)
+                else:
+                    call = asyncio.get_running_loop().run_in_executor(self.pool, lambda: tool.func(**kwargs))
+                    result = await asyncio.wait_for(call, tool.timeout)
+                output = json.dumps({"result": result}, default=str)
+            except asyncio.TimeoutError:
+                # A sync tool keeps its worker until it returns, the pool bounds how many can pile up
+                print(f"Tool {name} timed out after {tool.timeout}s")
+                return json.dumps({"error": f"{name} timed out"})
+            except Exception as e:
+                print(f"Tool {name} failed: {e}")
+                return json.dumps({"error": str(e)})
+        tool_latency_stats.add(time.perf_counter() - start)
+
+        if tool.cache_ttl:
+            self.cache[key] = (time.monotonic() + tool.cache_ttl, output)
+        return output
+
+    def shutdown(self):
+        for task in list(self.tasks):
+            task.cancel()
+        self.pool.shutdown(wait=False)
+
+
+# Built-in tools, add more with @registry.tool(...)
+registry = ToolRegistry()
+
+
+@registry.tool("Get the current local date and time.", cache_ttl=1)
+def get_current_time():
+    return datetime.now().strftime("%A %d %B %Y, %H:%M")
+
+
+@registry.tool(
+    "Set a timer that plays a chime when it runs out.",
+    parameters={
+        "type": "object",
+        "properties": {
+            "seconds": {"type": "number", "description": "Duration in seconds"},
+            "label": {"type": "string", "description": "What the timer is for"},
+        },
+        "required": ["seconds"],
+    },
+)
+def set_timer(seconds, label="timer"):
+    from audio_utils import earcons
+
+    def ring():
+        print(f"Timer done: {label}")
+        earcons.play("timer")
+
+    # Plain thread timer so it outlives the conversation that set it
+    timer = threading.Timer(float(seconds), ring)
+    timer.daemon = True
+    timer.start()
+    return f"{label} set for {float(seconds):g} seconds"
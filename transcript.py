@@ -0,0 +1,83 @@
+from collections import deque
+
+
+class Transcript:
+    """Captions built from streamed transcript deltas with incremental word wrap.
+
+    Deltas only ever extend the last line, so that is the only line that is
+    re-laid out; finished lines never change, which lets the renderer cache
+    them and scroll instead of redrawing. `measure(text)` returns the width of
+    a string in whatever unit `width` is given in (pixels or characters).
+    """
+    def __init__(self, measure, width, max_lines=200):
+        self.measure = measure
+        self.width = width
+        self.lines = deque(maxlen=max_lines)  # (text, ends_turn) of finished lines
+        self.finished = 0  # lines finished so far, including ones dropped from history
+        self.current = ""  # the line still being written
+
+    def append(self, delta):
+        text = self.current + delta
+        while self.width > 0 and self.measure(text) > self.width:
+            cut = self._break(text)
+            self._finish_line(text[:cut].rstrip(), False)
+            text = text[cut:].lstrip()
+        self.current = text
+
+    def end_turn(self):
+        """Finish the current line, the next delta starts a new one"""
+        if self.current.strip():
+            self._finish_line(self.current.rstrip(), True)
+            self.current = ""
+        elif self.lines and not self.lines[-1][1]:
+            self.lines[-1] = (self.lines[-1][0], True)
+
+    def lines_since(self, index):
+        """Finished lines with an index of `index` or later that are still in history"""
+        available = min(len(self.lines), self.finished - index)
+        if available <= 0:
+            return []
+        return [text for text, _ in list(self.lines)[-available:]]
+
+    def relayout(self, measure, width):
+        """Re-wrap the whole history, e.g. after a font or width change"""
+        turns = []
+        words = []
+        for text, ends_turn in self.lines:
+            words.append(text)
+            if ends_turn:
+                turns.append(" ".join(words))
+                words = []
+        pending = " ".join(words + [self.current]).strip()
+
+        self.measure = measure
+        self.width = width
+        self.lines.clear()
+        self.current = ""
+        for turn in turns:
+            self.append(turn)
+            self.end_turn()
+        self.append(pending)
+
+    def _finish_line(self, text, ends_turn):
+        self.lines.append((text, ends_turn))
+        self.finished += 1
+
+    def _break(self, text):
+        """Index to break `text` at: the last space that fits, or mid-word for a single long word"""
+        cut = 0
+        space = text.find(" ")
+        while space != -1 and self.measure(text[:space]) <= self.width:
+            cut = space
+            space = text.find(" ", space + 1)
+        if cut:
+            return cut
+
+        low, high = 1, len(text)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.measure(text[:middle]) <= self.width:
+                low = middle
+            else:
+                high = middle - 1
+        return low
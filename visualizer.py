@@ -0,0 +1,220 @@
+import threading
+import time
+from collections import deque
+import numpy as np
+from config import UI_FPS, VIS_MODE, RECORDING_SAMPLE_RATE, LLM_SAMPLE_RATE
+
+
+class PlaybackEnvelope:
+    """RMS envelope of what the player hands to the speaker.
+
+    The output callback writes one value per window into a preallocated
+    ring, without locks; the visualizer reads it every frame. heard() leaves
+    out the windows still in the device buffer, so the visuals follow what
+    comes out of the speaker rather than what the callback just queued.
+    """
+    def __init__(self, sample_rate=LLM_SAMPLE_RATE, window_ms=20, size=256):
+        self.window = max(1, int(sample_rate * window_ms / 1000))
+        self.window_s = self.window / sample_rate
+        self.values = np.zeros(size, dtype=np.float32)
+        self.written = 0  # windows written so far, the ring slot is written % size
+        self.carry = np.zeros(0, dtype=np.float32)  # partial window left over from the last block
+        self.updated_at = 0.0
+        self.latency = 0.0
+
+    def restart(self, output_latency=0.0):
+        """Playback (re)started with this much audio between the callback and the speaker"""
+        self.latency = output_latency
+        self.carry = np.zeros(0, dtype=np.float32)
+
+    def write(self, samples):
+        """Called from the audio callback with what was just handed to the speaker"""
+        batch = np.concatenate((self.carry, samples.astype(np.float32) / 32768.0))
+        usable = len(batch) - len(batch) % self.window
+        self.carry = batch[usable:]
+        if usable:
+            rms = np.sqrt(np.mean(batch[:usable].reshape(-1, self.window) ** 2, axis=1))
+            self.values[(self.written + np.arange(len(rms))) % len(self.values)] = rms
+            self.written += len(rms)  # after the values, a reader never sees unwritten slots
+        self.updated_at = time.monotonic()
+
+    def heard(self, count):
+        """(end, values): the last `count` windows that reached the speaker, oldest first"""
+        in_device = self.latency - (time.monotonic() - self.updated_at)
+        end = self.written - max(0, int(in_device / self.window_s))
+        index = np.arange(end - count, end)
+        return end, np.where(index >= 0, self.values[index % len(self.values)], 0.0)
+
+
+class AudioVisualizer:
+    """Turns raw int16 audio into ready-to-draw point lists on a worker thread.
+
+    Producers call feed() from the audio path, which only appends to a deque.
+    The worker drains it in batches at most once per frame, computes a
+    normalized RMS envelope and a log-spaced FFT spectrum with NumPy, and
+    publishes the result as a snapshot that the renderer picks up with
+    latest(). Nothing here runs on the render thread.
+
+    While following a PlaybackEnvelope, the envelope shows the reply as it
+    is heard instead, polled once per frame, and spectrum mode shows it too.
+    """
+    MODES = ("waveform", "spectrum")
+
+    def __init__(self, points=128, bands=48, fft_size=2048, window_ms=20, mode=VIS_MODE):
+        self.points = points
+        self.bands = bands
+        self.fft_size = fft_size
+        self.window_ms = window_ms
+        self.mode = mode
+        self.layout = (0, 0, 400, 100)  # left, baseline y, width, height in pixels
+
+        self.pending = deque(maxlen=256)
+        self.wakeup = threading.Event()
+        self.running = True
+        self.source = None  # PlaybackEnvelope being followed
+        self.source_end = None
+        self.played_at = 0.0
+        self.playing = False  # the envelope shows the source, not the fed audio
+        self.fed_at = 0.0  # when the worker last had audio to process
+
+        # Worker state
+        self.sample_rate = RECORDING_SAMPLE_RATE
+        self.history = np.zeros(fft_size, dtype=np.float32)
+        self.envelope = np.zeros(points, dtype=np.float32)
+        self.spectrum = np.zeros(bands, dtype=np.float32)
+        self.peak = 0.05  # auto-gain reference, decays towards quiet input
+        self.window = np.hanning(fft_size).astype(np.float32)
+        self._band_edges = None
+
+        # (sequence, points, pulse, closed) swapped in with one assignment
+        self.output = (0, [], 0.0, True)
+
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def set_layout(self, left, baseline, width, height):
+        self.layout = (left, baseline, width, height)
+
+    def toggle_mode(self):
+        self.mode = self.MODES[(self.MODES.index(self.mode) + 1) % len(self.MODES)]
+        self.wakeup.set()
+
+    def feed(self, samples, sample_rate=RECORDING_SAMPLE_RATE):
+        """Queue int16 audio for visualization, cheap enough for the audio path"""
+        self.pending.append((samples, sample_rate))
+        self.wakeup.set()
+
+    def follow(self, source):
+        """Show the reply from a PlaybackEnvelope while it advances, None to stop"""
+        self.source = source
+        self.source_end = None
+        self.wakeup.set()
+
+    def latest(self):
+        """Return (sequence, points, pulse, closed) of the newest computed frame"""
+        return self.output
+
+    def stop(self):
+        self.running = False
+        self.wakeup.set()
+        self.thread.join(timeout=1)
+
+    def _run(self):
+        interval = 1 / UI_FPS
+        while self.running:
+            source = self.source
+            settling = self.envelope.max() > 0.01 or self.spectrum.max() > 0.01
+            self.wakeup.wait(timeout=interval if source or settling else 0.5)
+            heard = source.heard(self.points) if source else None
+            advanced = heard is not None and heard[0] != self.source_end
+            started = time.monotonic()
+            if advanced and heard[1][-1] > 0:
+                self.played_at = started  # not the padding the player writes once the reply ran out
+            # Hold on to the reply between windows and across short pauses in it
+            playing = heard is not None and started - self.played_at < 0.25
+            if not self.wakeup.is_set() and not (advanced and playing) and playing == self.playing:
+                if settling and not playing and started - self.fed_at > 0.25:
+                    # No audio is coming in, let the waveform and the orb's pulse fall back to rest
+                    self.envelope *= 0.85
+                    self.spectrum *= 0.85
+                    self._publish()
+                continue
+            self.wakeup.clear()
+            self.playing = playing
+
+            chunks = []
+            while self.pending:
+                samples, rate = self.pending.popleft()
+                if rate != self.sample_rate:
+                    # Switched to audio at another rate, start from silence
+                    self.sample_rate = rate
+                    self.history[:] = 0
+                    self._band_edges = None
+                    chunks = []
+                chunks.append(samples)
+            if chunks:
+                self.fed_at = started
+                self._process(np.concatenate(chunks).astype(np.float32) / 32768.0)
+            if advanced and playing:
+                # What the speaker plays wins over the mic
+                end, values = heard
+                windows = end - self.source_end if self.source_end is not None else len(values)
+                self.source_end = end
+                self.peak = max(self.peak * 0.995 ** max(0, windows), float(values.max()), 0.01)
+                self.envelope = np.minimum(values / self.peak, 1.0)
+            self._publish()
+
+            # Batch whatever arrives during the rest of this frame
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+    def _process(self, batch):
+        # Normalized RMS envelope: one value per window, scrolling left
+        window = max(1, int(self.sample_rate * self.window_ms / 1000))
+        usable = len(batch) - len(batch) % window
+        if usable and not self.playing:
+            rms = np.sqrt(np.mean(batch[-usable:].reshape(-1, window) ** 2, axis=1))
+            self.peak = max(self.peak * 0.995 ** len(rms), float(rms.max()), 0.01)
+            rms = np.minimum(rms / self.peak, 1.0)[-self.points:]
+            self.envelope = np.concatenate((self.envelope[len(rms):], rms))
+
+        # Keep the last fft_size samples for the spectrum
+        if len(batch) >= self.fft_size:
+            self.history = batch[-self.fft_size:]
+        else:
+            self.history = np.concatenate((self.history[len(batch):], batch))
+
+        # Log-spaced spectrum in dB, normalized to 0..1 with fast attack and slow decay
+        magnitude = np.abs(np.fft.rfft(self.history * self.window))
+        levels = np.maximum.reduceat(magnitude, self._edges())[:-1]
+        db = 20 * np.log10(levels / (self.fft_size / 4) + 1e-9)
+        level = np.clip((db + 70) / 60, 0, 1)
+        if self.spectrum.shape != level.shape:
+            self.spectrum = np.zeros_like(level)
+        self.spectrum = np.where(level > self.spectrum, level, self.spectrum * 0.85 + level * 0.15)
+
+    def _edges(self):
+        """FFT bin edges of the log-spaced bands between 60Hz and 8kHz, merged where they collide"""
+        if self._band_edges is None:
+            nyquist = self.sample_rate / 2
+            freqs = np.geomspace(60, min(8000, nyquist * 0.95), self.bands + 1)
+            bins = np.round(freqs / nyquist * (self.fft_size // 2)).astype(int)
+            self._band_edges = np.unique(np.clip(bins, 1, self.fft_size // 2))
+        return self._band_edges
+
+    def _publish(self):
+        left, baseline, width, height = self.layout
+        if self.mode == "spectrum" and not self.playing:
+            values = self.spectrum
+            x = left + np.linspace(0, width, len(values))
+            points = np.column_stack((x, baseline - values * height))
+        else:
+            # Envelope mirrored around the baseline as one closed outline
+            values = self.envelope
+            x = left + np.linspace(0, width, len(values))
+            upper = np.column_stack((x, baseline - values * height / 2))
+            lower = np.column_stack((x[::-1], baseline + values[::-1] * height / 2))
+            points = np.concatenate((upper, lower))
+
+        pulse = float(self.envelope[-4:].mean())
+        closed = self.mode == "waveform" or self.playing
+        self.output = (self.output[0] + 1, points.tolist(), pulse, closed)
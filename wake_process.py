@@ -0,0 +1,257 @@
+import multiprocessing as mp
+import struct
+import threading
+import time
+from multiprocessing import shared_memory
+import numpy as np
+import pyaudio
+from config import PICOVOICE_KEY, MIC_INDEX, WAKE_GATE_ENABLED, WAKE_RING_FRAMES
+from perf_stats import startup_profile
+from wake_word import EnergyGate, handle_detection, frame_lag_stats, detect_latency_stats, preroll
+
+
+class SharedAudioRing:
+    """Single-producer, single-consumer ring of int16 frames in shared memory.
+
+    Layout: an int64 write counter, one float64 capture timestamp per slot,
+    then the frames themselves. The producer fills a slot before bumping the
+    counter, so the consumer never sees a half-written frame unless it falls
+    more than a full ring behind (which it detects and skips).
+    """
+    def __init__(self, frame_length, slots, name=None):
+        self.frame_length = frame_length
+        self.slots = slots
+        size = 8 + slots * 8 + slots * frame_length * 2
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        buf = self.shm.buf
+        self.counter = np.ndarray((1,), dtype=np.int64, buffer=buf, offset=0)
+        self.timestamps = np.ndarray((slots,), dtype=np.float64, buffer=buf, offset=8)
+        self.frames = np.ndarray((slots, frame_length), dtype=np.int16, buffer=buf, offset=8 + slots * 8)
+        if name is None:
+            self.counter[0] = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def write(self, pcm, captured_at):
+        index = int(self.counter[0])
+        slot = index % self.slots
+        self.frames[slot] = np.frombuffer(pcm, dtype=np.int16)
+        self.timestamps[slot] = captured_at
+        self.counter[0] = index + 1
+
+    def read_from(self, index):
+        """Return (next_index, dropped, [(frame_bytes, captured_at), ...]) since `index`."""
+        head = int(self.counter[0])
+        dropped = max(0, head - index - self.slots + 1)
+        index += dropped
+        frames = []
+        while index < head:
+            slot = index % self.slots
+            frames.append((self.frames[slot].tobytes(), float(self.timestamps[slot])))
+            index += 1
+        return index, dropped, frames
+
+    def close(self, unlink=False):
+        # Drop the numpy views first, SharedMemory refuses to close with exports alive
+        del self.counter, self.timestamps, self.frames
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+def _wake_worker(conn, frames_ready, stop_event):
+    """Child process: run Porcupine on frames from the shared ring, report detections."""
+    import pvporcupine
+
+    porcupine = pvporcupine.create(keywords=["jarvis"], access_key=PICOVOICE_KEY)
+    gate = EnergyGate() if WAKE_GATE_ENABLED else None
+    frame_format = "h" * porcupine.frame_length
+    refractory_until = 0.0
+    ring = None
+
+    try:
+        conn.send(("ready", porcupine.sample_rate, porcupine.frame_length))
+        _, ring_name, slots = conn.recv()
+        ring = SharedAudioRing(porcupine.frame_length, slots, name=ring_name)
+        index = int(ring.counter[0])
+        last_heartbeat = time.monotonic()
+
+        while not stop_event.is_set():
+            frames_ready.acquire(timeout=0.5)
+            index, dropped, frames = ring.read_from(index)
+            if dropped:
+                conn.send(("dropped", dropped))
+
+            for pcm, captured_at in frames:
+                if captured_at < refractory_until:
+                    continue  # Prevent multiple triggers
+                for frame in (gate.process(pcm) if gate else [pcm]):
+                    if porcupine.process(struct.unpack_from(frame_format, frame)) >= 0:
+                        conn.send(("wake", captured_at))
+                        refractory_until = captured_at + 1.0
+                        if gate:
+                            gate.reset()
+                        break
+
+            now = time.monotonic()
+            if now - last_heartbeat >= 1.0:
+                conn.send(("heartbeat", gate.pass_ratio if gate else 1.0))
+                last_heartbeat = now
+    except (EOFError, BrokenPipeError, KeyboardInterrupt):
+        pass
+    finally:
+        if ring:
+            ring.close()
+        porcupine.delete()
+
+
+class WakeWordProcess:
+    """Runs the wake engine in a separate process so it doesn't share the GIL with the UI.
+
+    The parent only captures audio into a shared memory ring; detections come
+    back over a pipe and are handled exactly like wakeup_detect does. A
+    supervisor thread restarts the worker if it dies or stops sending heartbeats.
+    """
+    def __init__(self, wakeword_callback, interrupt_event, heartbeat_timeout=5.0, max_restarts=5):
+        self.wakeword_callback = wakeword_callback
+        self.interrupt_event = interrupt_event
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_restarts = max_restarts
+        self.ctx = mp.get_context("spawn")  # Don't fork a process that has SDL and audio threads
+        self.running = False
+        self.restarts = 0
+        self.dropped_frames = 0
+        self.process = None
+        self.conn = None
+        self.ring = None
+        self.ring_lock = threading.Lock()
+        self.frames_ready = None
+        self.stop_event = None
+        self.last_heartbeat = 0.0
+        self.threads = []
+
+    def start(self):
+        self.running = True
+        with startup_profile.step("spawn wake process"):
+            self._spawn()
+        for target in (self._capture, self._supervise):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def _spawn(self):
+        """Start a worker and wait for it to be ready, then hand it a fresh ring."""
+        self.frames_ready = self.ctx.Semaphore(0)
+        self.stop_event = self.ctx.Event()
+        self.conn, child_conn = self.ctx.Pipe()
+        self.process = self.ctx.Process(
+            target=_wake_worker,
+            args=(child_conn, self.frames_ready, self.stop_event),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+        if not self.conn.poll(30):
+            raise RuntimeError("Wake word process did not start")
+        _, self.sample_rate, self.frame_length = self.conn.recv()
+        ring = SharedAudioRing(self.frame_length, WAKE_RING_FRAMES)
+        self.conn.send(("ring", ring.name, ring.slots))
+        with self.ring_lock:
+            old, self.ring = self.ring, ring
+        if old:
+            old.close(unlink=True)
+        self.last_heartbeat = time.monotonic()
+        print(f"Wake word process started (pid {self.process.pid})")
+
+    def _teardown_worker(self):
+        self.stop_event.set()
+        self.frames_ready.release()
+        self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+    def _capture(self):
+        """Read the microphone and publish frames to the ring; no wake work happens here."""
+        while self.running and self.ring is None:
+            time.sleep(0.05)
+        with startup_profile.step("open microphone"):
+            pa = pyaudio.PyAudio()
+            stream = pa.open(
+                rate=self.sample_rate,
+                channels=1,
+                format=pyaudio.paInt16,
+                input=True,
+                frames_per_buffer=self.frame_length,
+                input_device_index=MIC_INDEX,
+            )
+        startup_profile.mark("listening")
+        preroll.configure(self.sample_rate, self.frame_length)
+        try:
+            while self.running:
+                pcm = stream.read(self.frame_length, exception_on_overflow=False)
+                lag = stream.get_read_available() / self.sample_rate
+                captured_at = time.monotonic() - lag
+                frame_lag_stats.add(lag)
+                preroll.write(pcm, captured_at)
+                with self.ring_lock:
+                    self.ring.write(pcm, captured_at)
+                self.frames_ready.release()
+        finally:
+            stream.stop_stream()
+            stream.close()
+            pa.terminate()
+
+    def _supervise(self):
+        """Dispatch detections and restart the worker if it dies or goes silent."""
+        while self.running:
+            try:
+                if self.conn.poll(0.1):
+                    message = self.conn.recv()
+                    self.last_heartbeat = time.monotonic()
+                    if message[0] == "wake":
+                        detect_latency_stats.add(time.monotonic() - message[1])
+                        handle_detection(self.wakeword_callback, self.interrupt_event, message[1])
+                    elif message[0] == "dropped":
+                        self.dropped_frames += message[1]
+                    continue
+            except (EOFError, OSError):
+                pass
+
+            if not self.running:
+                break
+            alive = self.process.is_alive()
+            if alive and time.monotonic() - self.last_heartbeat < self.heartbeat_timeout:
+                continue
+
+            print("Wake word process died" if not alive else "Wake word process stopped responding")
+            self._teardown_worker()
+            if self.restarts >= self.max_restarts:
+                print("Wake word process keeps failing, giving up")
+                self.running = False
+                break
+            self.restarts += 1
+            time.sleep(min(2 ** self.restarts, 30))
+            try:
+                self._spawn()
+            except Exception as e:
+                # Leave it to the next pass, a stuck worker will miss its heartbeat
+                print(f"Error restarting wake word process: {e}")
+
+    def stop(self):
+        self.running = False
+        for thread in self.threads:
+            thread.join(timeout=2)
+        if self.process:
+            self._teardown_worker()
+        if self.ring:
+            self.ring.close(unlink=True)
+            self.ring = None
+        print(f"Wake word process stopped ({self.restarts} restarts, {self.dropped_frames} frames dropped)")
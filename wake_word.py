@@ -3,69 +3,211 @@ import pvporcupine
 import struct
 import threading
 import time
-from config import PICOVOICE_KEY, MIC_INDEX
+from collections import deque
+import numpy as np
+from config import (
+    PICOVOICE_KEY,
+    MIC_INDEX,
+    WAKE_GATE_ENABLED,
+    WAKE_GATE_THRESHOLD_DB,
+    WAKE_GATE_MIN_DB,
+    WAKE_GATE_LOOKBACK_FRAMES,
+    WAKE_GATE_HANGOVER_FRAMES,
+    PREROLL_SECONDS,
+)
+from perf_stats import LatencyStats, startup_profile
+from metrics import wake_detections
 
 
-def wakeup_detect(wakeword_callback, interrupt_event):
-    """Detect wake word and call callback when detected."""
+# How stale audio is when read from the device, and capture-to-callback delay
+frame_lag_stats = LatencyStats("Wake frame lag")
+detect_latency_stats = LatencyStats("Wake detection latency")
+
+
+class EnergyGate:
+    """Cheap pre-filter that only lets frames with acoustic activity through.
+
+    Short-term energy is compared against an adaptive noise floor. While the
+    gate is closed, frames are kept in a small look-back buffer which is
+    replayed on the next onset so the start of the wake word is never lost.
+    """
+    def __init__(self, threshold_db=WAKE_GATE_THRESHOLD_DB, min_db=WAKE_GATE_MIN_DB,
+                 lookback_frames=WAKE_GATE_LOOKBACK_FRAMES,
+                 hangover_frames=WAKE_GATE_HANGOVER_FRAMES):
+        self.threshold_db = threshold_db
+        self.min_db = min_db
+        self.hangover_frames = hangover_frames
+        self.lookback = deque(maxlen=lookback_frames)
+        self.noise_floor = None
+        self.hangover = 0
+        # Floor follows drops quickly and rises slowly so speech doesn't raise it
+        self.floor_fall = 0.2
+        self.floor_rise = 0.005
+        # Stats for reporting how much work the gate saves
+        self.frames_seen = 0
+        self.frames_passed = 0
+
+    @staticmethod
+    def energy_db(pcm):
+        """Mean energy of a raw int16 frame in dB."""
+        samples = np.frombuffer(pcm, dtype=np.int16).astype(np.float32)
+        return 10 * np.log10(np.dot(samples, samples) / len(samples) + 1e-9)
+
+    def process(self, pcm):
+        """Return the list of raw frames that should be passed to the wake engine."""
+        self.frames_seen += 1
+        energy = self.energy_db(pcm)
+
+        if self.noise_floor is None:
+            self.noise_floor = energy
+        rate = self.floor_fall if energy < self.noise_floor else self.floor_rise
+        self.noise_floor += rate * (energy - self.noise_floor)
+
+        if energy > self.min_db and energy > self.noise_floor + self.threshold_db:
+            self.hangover = self.hangover_frames
+        elif self.hangover > 0:
+            self.hangover -= 1
+        else:
+            self.lookback.append(pcm)
+            return []
+
+        # Onset or ongoing activity: flush the look-back so nothing is lost
+        frames = list(self.lookback)
+        frames.append(pcm)
+        self.lookback.clear()
+        self.frames_passed += len(frames)
+        return frames
+
+    def reset(self):
+        """Drop buffered audio, e.g. after a detection."""
+        self.lookback.clear()
+        self.hangover = 0
+
+    @property
+    def pass_ratio(self):
+        return self.frames_passed / self.frames_seen if self.frames_seen else 1.0
+
+
+class PreRollBuffer:
+    """Ring of the most recent wake mic frames, so the session can start from the wake word.
+
+    The wake capture loop writes every frame; only the loop that called
+    configure() may write, a second one is ignored. A detection marks its
+    capture time, and take() returns everything heard from that point until
+    the first sample the session's own microphone delivered.
+    """
+    def __init__(self, seconds=PREROLL_SECONDS):
+        self.seconds = seconds
+        self.sample_rate = 16000
+        self.frames = deque()
+        self.mark_at = None
+        self.writer = None  # thread of the capture loop that fills the buffer
+        self.lock = threading.Lock()
+
+    def configure(self, sample_rate, frame_length):
+        """Claim the buffer for the calling capture loop, False if another one is still running"""
+        current = threading.current_thread()
+        with self.lock:
+            if self.writer is not None and self.writer is not current and self.writer.is_alive():
+                print("Pre-roll already filled by another wake capture loop, not writing from this one")
+                return False
+            self.writer = current
+            self.sample_rate = sample_rate
+            self.frames = deque(maxlen=max(1, int(self.seconds * sample_rate / frame_length)))
+            return True
+
+    def write(self, pcm, captured_at):
+        if self.seconds > 0 and threading.current_thread() is self.writer:
+            with self.lock:
+                self.frames.append((captured_at, pcm))
+
+    def mark(self, captured_at):
+        self.mark_at = captured_at
+
+    def take(self, until):
+        """Return (int16 samples, sample_rate) captured between the last mark and `until`, once"""
+        mark_at, self.mark_at = self.mark_at, None
+        if mark_at is None:
+            return np.zeros(0, dtype=np.int16), self.sample_rate
+        with self.lock:
+            frames = [pcm for captured_at, pcm in self.frames if mark_at <= captured_at < until]
+        return np.frombuffer(b"".join(frames), dtype=np.int16), self.sample_rate
+
+
+# Filled by whichever wake capture loop is running
+preroll = PreRollBuffer()
+
+
+def handle_detection(wakeword_callback, interrupt_event, captured_at=None):
+    """Interrupt the running conversation or start a new one."""
+    print("Wake word detected!")
+    wake_detections.inc()
+    if interrupt_event.is_set():
+        # If AI is currently talking, interrupt it
+        print("Interrupting current conversation...")
+        time.sleep(0.5)  # Small delay to let cleanup happen
+        interrupt_event.clear()
+    else:
+        # Start new conversation, the session picks up the audio from here on
+        if captured_at is not None:
+            preroll.mark(captured_at)
+        wakeword_callback()
+
+
+def wakeup_detect(wakeword_callback, interrupt_event, stop_event=None):
+    """Detect wake word and call callback when detected, until stop_event is set."""
     # Create Porcupine wake word engine instance with the default wakeword
-    porcupine = pvporcupine.create(keywords=["jarvis"], access_key=PICOVOICE_KEY)
+    with startup_profile.step("pvporcupine.create"):
+        porcupine = pvporcupine.create(keywords=["jarvis"], access_key=PICOVOICE_KEY)
 
     # Open audio stream from microphone
-    pa = pyaudio.PyAudio()
-    stream = pa.open(
-        rate=porcupine.sample_rate,
-        channels=1,
-        format=pyaudio.paInt16,
-        input=True,
-        frames_per_buffer=porcupine.frame_length,
-        input_device_index=MIC_INDEX,
-    )
+    with startup_profile.step("open microphone"):
+        pa = pyaudio.PyAudio()
+        stream = pa.open(
+            rate=porcupine.sample_rate,
+            channels=1,
+            format=pyaudio.paInt16,
+            input=True,
+            frames_per_buffer=porcupine.frame_length,
+            input_device_index=MIC_INDEX,
+        )
+
+    # Skip Porcupine on silent frames, it is the biggest idle CPU cost
+    gate = EnergyGate() if WAKE_GATE_ENABLED else None
+    frame_format = "h" * porcupine.frame_length
+    preroll.configure(porcupine.sample_rate, porcupine.frame_length)
+    refractory_until = 0.0
 
     print("Listening for wake word...")
+    startup_profile.mark("listening")
     try:
-        while True:
+        while not (stop_event and stop_event.is_set()):
             pcm = stream.read(porcupine.frame_length, exception_on_overflow=False)
-            pcm_unpacked = struct.unpack_from("h" * porcupine.frame_length, pcm)
+            lag = stream.get_read_available() / porcupine.sample_rate
+            captured_at = time.monotonic() - lag
+            frame_lag_stats.add(lag)
+            preroll.write(pcm, captured_at)
+            if captured_at < refractory_until:
+                continue  # Prevent multiple triggers, but keep reading so the pre-roll has no gap
+            frames = gate.process(pcm) if gate else [pcm]
 
-            result = porcupine.process(pcm_unpacked)
+            result = -1
+            for frame in frames:
+                result = porcupine.process(struct.unpack_from(frame_format, frame))
+                if result >= 0:
+                    break
             if result >= 0:
-                print("Wake word detected!")
-                if interrupt_event.is_set():
-                    # If AI is currently talking, interrupt it
-                    print("Interrupting current conversation...")
-                    time.sleep(0.5)  # Small delay to let cleanup happen
-                    interrupt_event.clear()
-                else:
-                    # Start new conversation
-                    wakeword_callback()
-                time.sleep(1)  # Prevent multiple triggers
+                detect_latency_stats.add(time.monotonic() - captured_at)
+                handle_detection(wakeword_callback, interrupt_event, captured_at)
+                refractory_until = captured_at + 1.0
+                if gate:
+                    gate.reset()
     except KeyboardInterrupt:
         print("Stopping wake word detection...")
     finally:
+        if gate:
+            print(f"Wake gate passed {gate.pass_ratio:.1%} of frames to Porcupine")
         stream.stop_stream()
         stream.close()
         pa.terminate()
         porcupine.delete()
-
-
-class BackgroundWakeWordDetector:
-    """Background thread for wake word detection during conversations."""
-    def __init__(self, interrupt_event):
-        self.thread = None
-        self.running = False
-        self.interrupt_event = interrupt_event
-
-    def start(self):
-        self.running = True
-        self.thread = threading.Thread(target=self._run_detection)
-        self.thread.daemon = True
-        self.thread.start()
-
-    def _run_detection(self):
-        wakeup_detect(lambda: None, self.interrupt_event)  # Empty callback since we use the interrupt event
-
-    def stop(self):
-        self.running = False
-        if self.thread:
-            self.thread.join()
\ No newline at end of file
@@ -0,0 +1,110 @@
+import faulthandler
+import os
+import sys
+import threading
+import time
+from config import WATCHDOG_STALL_S, WATCHDOG_ESCALATION, WATCHDOG_GRACE_S, WATCHDOG_RESET_S
+from metrics import watchdog_stalls, watchdog_recoveries
+
+
+def reexec():
+    """Replace the process with a fresh copy of itself, same arguments"""
+    print("Watchdog: re-executing the process", flush=True)
+    sys.stderr.flush()
+    os.execv(sys.executable, [sys.executable] + sys.argv)
+
+
+class Watchdog:
+    """Notices loops that stop checking in and recovers from it.
+
+    Loops call beat(name) every iteration: the session event loop from its
+    lag probe, the render loop once per frame. A thread checks the beats
+    twenty times per stall period; a beat older than `stall_s` is a stall.
+    The stacks of all threads go to stderr, the stall is counted in the
+    metrics and the next of that loop's steps in `escalation` runs. A stall
+    that outlasts the step's grace period, or the loop's next stall, takes
+    the step after that. Steps are registered by the app with on(), "exec"
+    is built in.
+    """
+    def __init__(self, stall_s=WATCHDOG_STALL_S, escalation=WATCHDOG_ESCALATION,
+                 grace_s=WATCHDOG_GRACE_S, reset_s=WATCHDOG_RESET_S):
+        self.stall_s = stall_s
+        self.escalation = escalation  # loop name -> recovery steps in order
+        self.grace_s = grace_s
+        self.reset_s = reset_s
+        self.actions = {"exec": reexec}
+        self.beats = {}  # loop name -> perf_counter of its last beat
+        self.stalled = {}  # loop name -> its last beat before the stall
+        self.level = {}  # loop name -> index of its next step
+        self.last_step = {}  # loop name -> when its last step ran
+        self.running = False
+        self.thread = None
+
+    def on(self, step, action):
+        """Register the callable that performs a recovery step, called from the watchdog thread"""
+        self.actions[step] = action
+
+    def beat(self, name):
+        self.beats[name] = time.perf_counter()
+
+    def forget(self, name):
+        """Stop watching a loop that is shutting down"""
+        self.beats.pop(name, None)
+        self.stalled.pop(name, None)
+        self.level.pop(name, None)
+        self.last_step.pop(name, None)
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="watchdog", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop watching, before a shutdown that may legitimately take a while"""
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=1)
+
+    def _run(self):
+        while self.running:
+            time.sleep(self.stall_s / 20)
+            if self.running:
+                self.check(time.perf_counter())
+
+    def check(self, now):
+        for name, last_step in list(self.last_step.items()):
+            if now - last_step > self.reset_s:
+                self.level.pop(name, None)
+                self.last_step.pop(name, None)
+        for name, last in list(self.beats.items()):
+            age = now - last
+            if age < self.stall_s:
+                stalled_since = self.stalled.pop(name, None)
+                if stalled_since is not None:
+                    print(f"Watchdog: {name} is back after {last - stalled_since:.1f}s")
+                continue
+            if name not in self.stalled:
+                self.stalled[name] = last
+                watchdog_stalls.labels(name).inc()
+                print(f"Watchdog: {name} stalled for {age:.1f}s, stacks of all threads:", flush=True)
+                faulthandler.dump_traceback(all_threads=True)
+            if name not in self.last_step or now - self.last_step[name] >= self.grace_s:
+                self.escalate(name, now)
+
+    def escalate(self, name, now):
+        steps = [step for step in self.escalation.get(name, ()) if step in self.actions]
+        if not steps:
+            return
+        level = self.level.get(name, 0)
+        step = steps[min(level, len(steps) - 1)]
+        self.level[name] = level + 1
+        self.last_step[name] = now
+        watchdog_recoveries.labels(step).inc()
+        print(f"Watchdog: {name} stalled, recovery step: {step} restart")
+        try:
+            self.actions[step]()
+        except Exception as e:
+            print(f"Watchdog: {step} restart failed: {e!r}")
+
+
+watchdog = Watchdog()